@@ -0,0 +1,212 @@
+# batch_runner.py
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache import ResultCache, workload_digest
+from compare import ALGORITHMS, DEFAULT_RUNS, run_algorithm
+from process import load_process_table
+
+# Workload file extensions the batch runner picks up
+WORKLOAD_EXTENSIONS = (".csv", ".cpuw")
+
+# Batch results file: magic, version, reserved, row count and metadata length, then the
+# metadata as utf-8 JSON (column names and types, string tables and per-file errors),
+# then every column as a little-endian array. String columns are stored as int64 indexes
+# into their string table, integer columns as int64 and metric columns as float64.
+BATCH_MAGIC = b"CPUB"
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<4sHHQQ")
+
+# Columns of the results file and their array typecodes ("s" for string columns)
+BATCH_COLUMNS = [("file", "s"), ("algorithm", "s"), ("params", "s"), ("processes", "q"), ("wall_time", "d"),
+                 ("avg_waiting_time", "d"), ("avg_turnaround_time", "d"), ("avg_response_time", "d")]
+for _metric in ("waiting_time", "turnaround_time", "response_time"):
+    BATCH_COLUMNS += [(f"{_metric}_p50", "d"), (f"{_metric}_p95", "d"), (f"{_metric}_p99", "d"),
+                      (f"{_metric}_max", "d")]
+
+
+# Lists the workload files under a directory, sorted, optionally including subdirectories
+def find_workload_files(directory, recursive=False):
+    paths = []
+    for root, directories, files in os.walk(directory):
+        if not recursive:
+            directories.clear()
+        for name in files:
+            if name.endswith(WORKLOAD_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+# Loads one workload file and runs every (algorithm, parameters) combination on it.
+# Returns (path, rows, error); a file that cannot be read or holds no processes gives no
+# rows and its error.
+# Runs are seeded from the seed, the file name and the run, so results do not depend on
+# which worker ran the file or when, and a cache.ResultCache, if given, is checked first.
+def run_workload_file(path, name, runs, seed, cache=None):
+    try:
+        workload = load_process_table(path)
+        if len(workload) == 0:
+            raise ValueError(f"'{path}' has no processes")
+    except (OSError, ValueError, IndexError, struct.error) as error:
+        return path, [], f"{type(error).__name__}: {error}"
+    digest = workload_digest(workload) if cache is not None else None
+    rows = []
+    for run_index, (algorithm, params) in enumerate(runs):
+        started = time.perf_counter()
+        row = run_algorithm(workload, algorithm, params, seed=f"{seed}:{name}:{run_index}", cache=cache,
+                            digest=digest)
+        row["wall_time"] = time.perf_counter() - started
+        row["file"] = name
+        rows.append(row)
+    return path, rows, None
+
+
+# Column-wise accumulator for result rows
+class BatchResults:
+    def __init__(self):
+        self.columns = {name: array('q' if typecode == "s" else typecode) for name, typecode in BATCH_COLUMNS}
+        self.strings = {name: [] for name, typecode in BATCH_COLUMNS if typecode == "s"}
+        self.string_indexes = {name: {} for name in self.strings}
+        self.errors = {}
+
+    def __len__(self):
+        return len(self.columns["file"])
+
+    def add(self, row):
+        for name, typecode in BATCH_COLUMNS:
+            value = row[name]
+            if typecode == "s":
+                if not isinstance(value, str):
+                    value = json.dumps(value, sort_keys=True, default=repr)
+                indexes = self.string_indexes[name]
+                if value not in indexes:
+                    indexes[value] = len(self.strings[name])
+                    self.strings[name].append(value)
+                value = indexes[value]
+            self.columns[name].append(value)
+
+    # Writes the results file, through a temporary file renamed into place
+    def save(self, filename):
+        metadata = json.dumps({"columns": BATCH_COLUMNS, "strings": self.strings, "errors": self.errors}).encode()
+        temporary_path = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary_path, mode='wb') as file:
+            file.write(BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, 0, len(self), len(metadata)))
+            file.write(metadata)
+            for name, _ in BATCH_COLUMNS:
+                column = self.columns[name]
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                file.write(column.tobytes())
+        os.replace(temporary_path, filename)
+
+
+# Loads a batch results file as a dict of columns (lists of strings for string columns,
+# arrays otherwise), with the per-file errors under "errors"
+def load_batch_results(filename):
+    with open(filename, mode='rb') as file:
+        magic, version, _, count, metadata_length = BATCH_HEADER.unpack(file.read(BATCH_HEADER.size))
+        if magic != BATCH_MAGIC or version != BATCH_VERSION:
+            raise ValueError(f"'{filename}' is not a version {BATCH_VERSION} batch results file")
+        metadata = json.loads(file.read(metadata_length).decode())
+        results = {}
+        for name, typecode in metadata["columns"]:
+            column = array('q' if typecode == "s" else typecode)
+            column.fromfile(file, count)
+            if sys.byteorder == "big":
+                column.byteswap()
+            if typecode == "s":
+                table = metadata["strings"][name]
+                column = [table[index] for index in column]
+            results[name] = column
+    results["errors"] = metadata["errors"]
+    return results
+
+
+# Runs every (algorithm, parameters) combination on every workload file under a directory
+# and writes the results to one columnar file (see load_batch_results).
+# Each file is loaded and simulated inside a pool worker, so reading one file overlaps with
+# simulating others, and at most 2 * max_workers files are in flight at a time, so memory
+# stays bounded however many files there are. progress(done, total), if given, is called
+# as files finish. A cache.ResultCache, if given, is checked before every run (wall_time
+# is then the time of the lookup). Returns the BatchResults.
+def run_batch(directory, runs=DEFAULT_RUNS, output="batch_results.cpub", max_workers=None, seed=0,
+              recursive=False, progress=None, cache=None):
+    paths = find_workload_files(directory, recursive)
+    tasks = ((path, os.path.relpath(path, directory), runs, seed, cache) for path in paths)
+    results = BatchResults()
+    finished = {}  # Results by path, so the file lists rows in path order
+    done_count = 0
+
+    def collect(result):
+        nonlocal done_count
+        path, rows, error = result
+        finished[path] = (rows, error)
+        done_count += 1
+        if progress is not None:
+            progress(done_count, len(paths))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        for task in tasks:
+            collect(run_workload_file(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for task in tasks:
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(executor.submit(run_workload_file, *task))
+            for future in pending:
+                collect(future.result())
+
+    for path in paths:
+        rows, error = finished.pop(path)
+        if error is not None:
+            results.errors[os.path.relpath(path, directory)] = error
+        for row in rows:
+            results.add(row)
+    results.save(output)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scheduling algorithms over a directory of workload files.")
+    parser.add_argument("directory", help="directory of .csv or .cpuw workload files")
+    parser.add_argument("--algorithms", type=lambda text: text.split(","), default=[name for name, _ in DEFAULT_RUNS],
+                        help=f"comma-separated algorithms out of {', '.join(ALGORITHMS)}")
+    parser.add_argument("--quantum", type=int, default=2, help="Round Robin time quantum")
+    parser.add_argument("--recursive", action="store_true", help="include subdirectories")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="batch_results.cpub")
+    parser.add_argument("--cache", metavar="DIRECTORY", help="reuse and store results in this result cache")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithms: {', '.join(unknown)}")
+    runs = [(name, {"time_quantum": args.quantum} if name == "Round Robin" else {}) for name in args.algorithms]
+
+    def report(done, total):
+        print(f"\r{done}/{total} files", end="", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    cache = ResultCache(args.cache) if args.cache else None
+    results = run_batch(args.directory, runs, args.output, args.workers, args.seed, args.recursive, report, cache)
+    print(file=sys.stderr)
+    print(f"Wrote {len(results)} results to {args.output} in {time.perf_counter() - started:.1f}s")
+    for name, error in results.errors.items():
+        print(f"Skipped {name}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmark.py
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+from process import generate_process_table
+from scheduling import (fcfs_scheduling, sjf_scheduling, priority_scheduling, srtf_scheduling,
+                        round_robin_scheduling, cfs_scheduling, mlfq_scheduling)
+from tracing import NULL_SINK, CountingTraceSink
+
+# Schedulers covered by the benchmark; Round Robin is run once per quantum
+SCHEDULERS = {
+    "FCFS": fcfs_scheduling,
+    "SJF": sjf_scheduling,
+    "Priority": priority_scheduling,
+    "SRTF": srtf_scheduling,
+    "Round Robin": round_robin_scheduling,
+    "CFS": cfs_scheduling,
+    "MLFQ": mlfq_scheduling,
+}
+
+DEFAULT_SIZES = [10 ** exponent for exponent in range(2, 8)]
+
+
+# Returns the current git commit, or None outside a git checkout
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Times one scheduler run on a workload and, optionally, measures its peak memory.
+# The timed run uses the null sink; event counting and tracemalloc happen in a second
+# run so they do not distort the wall time.
+def benchmark_run(scheduler, workload, params, seed, measure_memory=True):
+    start = time.perf_counter()
+    scheduler(workload, sink=NULL_SINK, rng=random.Random(seed), **params)
+    wall_time = time.perf_counter() - start
+
+    counter = CountingTraceSink()
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+    scheduler(workload, sink=counter, rng=random.Random(seed), **params)
+    if measure_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "wall_time": wall_time,
+        "peak_memory": peak_memory,
+        "events": counter.count,
+        "events_per_second": counter.count / wall_time if wall_time > 0 else None,
+    }
+
+
+# Runs every scheduler over every (size, arrival spread, quantum) combination.
+# The arrival spread scales the arrival window with the workload size:
+# max_arrival_time = spread * size, so a spread of 5.5 keeps the CPU about fully loaded.
+def run_benchmarks(sizes=DEFAULT_SIZES, spreads=(1.0,), quanta=(2,), algorithms=tuple(SCHEDULERS),
+                   seed=0, measure_memory=True, verbose=True):
+    results = []
+    for size in sizes:
+        for spread in spreads:
+            workload = generate_process_table(size, random.Random(f"{seed}:{size}:{spread}"),
+                                              max_arrival_time=max(int(spread * size), 0))
+            for name in algorithms:
+                for params in ([{"time_quantum": quantum} for quantum in quanta]
+                               if name == "Round Robin" else [{}]):
+                    row = {"algorithm": name, "size": size, "arrival_spread": spread, "params": params}
+                    row.update(benchmark_run(SCHEDULERS[name], workload, params, seed, measure_memory))
+                    results.append(row)
+                    if verbose:
+                        print("{:<12} n={:<9} spread={:<6} {:<20} {:>9.3f}s {:>12.0f} events/s".format(
+                            name, size, spread, json.dumps(params), row["wall_time"], row["events_per_second"] or 0))
+    return results
+
+
+# Reports runs that got slower than the baseline by more than the given fraction
+def find_regressions(results, baseline, threshold=0.10):
+    def key(row):
+        return row["algorithm"], row["size"], row["arrival_spread"], json.dumps(row["params"], sort_keys=True)
+
+    baseline_times = {key(row): row["wall_time"] for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        before = baseline_times.get(key(row))
+        if before and row["wall_time"] > before * (1 + threshold):
+            regressions.append((row, before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every scheduler over seeded workloads.")
+    parser.add_argument("--sizes", type=lambda text: [int(float(size)) for size in text.split(",")],
+                        default=DEFAULT_SIZES, help="comma-separated workload sizes (default 1e2..1e7)")
+    parser.add_argument("--spreads", type=lambda text: [float(spread) for spread in text.split(",")],
+                        default=[1.0], help="arrival window as a multiple of the workload size")
+    parser.add_argument("--quanta", type=lambda text: [int(quantum) for quantum in text.split(",")],
+                        default=[2], help="Round Robin time quanta")
+    parser.add_argument("--algorithms", type=lambda text: text.split(","), default=list(SCHEDULERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.spreads, args.quanta, args.algorithms, args.seed,
+                             measure_memory=not args.no_memory)
+    report = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for row, before in regressions:
+            print(f"REGRESSION {row['algorithm']} n={row['size']} spread={row['arrival_spread']} "
+                  f"{json.dumps(row['params'])}: {before:.3f}s -> {row['wall_time']:.3f}s")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# cache.py
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+from process import Process, ProcessTable, copy_column
+
+# Bump when a scheduler change makes earlier cached results wrong
+CACHE_VERSION = 3
+
+# Per-process columns stored for a cached run, in completion order
+RESULT_COLUMNS = ("pid", "arrival_time", "duration", "priority", "completion_time", "waiting_time",
+                  "turnaround_time", "response_time")
+
+# Result file: magic, version, row count, trace length and extra length, then the
+# RESULT_COLUMNS as little-endian int64 arrays, then the captured trace as utf-8 (if any),
+# then any extra values of the run as utf-8 JSON
+RESULT_MAGIC = b"CPUR"
+RESULT_HEADER = struct.Struct("<4sHHQQQ")
+
+# Per-process ResultCache instances opened by open_cache, by (directory, max_bytes)
+_open_caches = {}
+
+
+# Content hash of a workload's four input columns
+def workload_digest(workload):
+    if not isinstance(workload, ProcessTable):
+        workload = ProcessTable.from_processes(workload)
+    digest = hashlib.sha256(struct.pack("<Q", len(workload)))
+    for column in (workload.pid, workload.arrival_time, workload.duration, workload.priority):
+        if sys.byteorder == "big":
+            column = copy_column(column)
+            column.byteswap()
+        digest.update(memoryview(column).cast('B'))
+    return digest.hexdigest()
+
+
+# Cache key for one run: the workload digest plus the algorithm, its parameters and the seed.
+# Parameters are keyed by their repr, so objects such as transient-event models need a
+# repr that spells out their configuration.
+def result_key(digest, algorithm, params, seed):
+    description = json.dumps([CACHE_VERSION, digest, algorithm, params, seed], sort_keys=True, default=repr)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+# Extracts the RESULT_COLUMNS of a list of completed processes as int64 arrays
+def result_columns(processes):
+    columns = tuple(array('q') for _ in RESULT_COLUMNS)
+    for process in processes:
+        for column, name in zip(columns, RESULT_COLUMNS):
+            value = getattr(process, name)
+            column.append(0 if value is None else value)
+    return columns
+
+
+# Rebuilds completed Process objects from result columns
+def result_processes(columns):
+    processes = []
+    for (pid, arrival_time, duration, priority, completion_time, waiting_time, turnaround_time,
+         response_time) in zip(*columns):
+        process = Process(pid, arrival_time, duration, priority)
+        process.remaining_duration = 0
+        process.completion_time = completion_time
+        process.waiting_time = waiting_time
+        process.turnaround_time = turnaround_time
+        process.response_time = response_time
+        processes.append(process)
+    return processes
+
+
+# Content-addressed on-disk cache of scheduler results.
+# Each entry is one file named by its key. The index of entries is kept in least recently
+# used order (file modification times, refreshed on every hit, carry the order across
+# sessions), and the oldest entries are deleted once the cache grows past max_bytes.
+# Entries are written to a temporary file and renamed into place, so a crash never leaves
+# a partial entry behind. A cache sent to a worker process reopens the same directory
+# there (once per process). Lookups also find entries other processes have written since
+# the index was read; each process evicts by its own view of the directory.
+class ResultCache:
+    def __init__(self, directory=".result_cache", max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".res") and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        entries.sort()
+        self.entries = OrderedDict((key, size) for _, key, size in entries)  # Oldest first
+        self.total_bytes = sum(self.entries.values())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __reduce__(self):
+        return open_cache, (self.directory, self.max_bytes)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".res")
+
+    # Returns (result columns, trace, extra) for a key, or None on a miss
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, mode='rb') as file:
+                magic, version, _, count, trace_length, extra_length = RESULT_HEADER.unpack(
+                    file.read(RESULT_HEADER.size))
+                if magic != RESULT_MAGIC or version != CACHE_VERSION:
+                    raise ValueError(f"'{path}' is not a version {CACHE_VERSION} result file")
+                columns = []
+                for _ in RESULT_COLUMNS:
+                    column = array('q')
+                    column.fromfile(file, count)
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    columns.append(column)
+                trace = file.read(trace_length).decode() if trace_length else None
+                extra = json.loads(file.read(extra_length).decode()) if extra_length else None
+            os.utime(path)
+        except (OSError, EOFError, ValueError, struct.error):
+            self.discard(key)  # Deleted or damaged behind our back
+            return None
+        if key not in self.entries:
+            # Written by another process sharing the directory
+            self.entries[key] = os.path.getsize(path)
+            self.total_bytes += self.entries[key]
+            self.evict()
+        self.entries.move_to_end(key)
+        return tuple(columns), trace, extra
+
+    # Stores the result columns (and optionally the captured trace and a JSON-serializable
+    # dict of extra values) of a run
+    def put(self, key, columns, trace=None, extra=None):
+        encoded_trace = trace.encode() if trace is not None else b""
+        encoded_extra = json.dumps(extra).encode() if extra is not None else b""
+        path = self.path(key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, mode='wb') as file:
+            file.write(RESULT_HEADER.pack(RESULT_MAGIC, CACHE_VERSION, 0, len(columns[0]), len(encoded_trace),
+                                          len(encoded_extra)))
+            for column in columns:
+                if sys.byteorder == "big":
+                    column = copy_column(column)
+                    column.byteswap()
+                file.write(column.tobytes())
+            file.write(encoded_trace)
+            file.write(encoded_extra)
+        os.replace(temporary_path, path)
+
+        self.total_bytes -= self.entries.pop(key, 0)
+        self.entries[key] = os.path.getsize(path)
+        self.total_bytes += self.entries[key]
+        self.evict()
+
+    # Deletes least recently used entries until the cache fits in max_bytes
+    def evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        self.total_bytes -= self.entries.pop(key, 0)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for key in list(self.entries):
+            self.discard(key)
+
+
+# Returns this process's ResultCache for a directory, opening it on first use
+def open_cache(directory=".result_cache", max_bytes=1 << 30):
+    cache = _open_caches.get((directory, max_bytes))
+    if cache is None:
+        cache = _open_caches[(directory, max_bytes)] = ResultCache(directory, max_bytes)
+    return cache
+
+
+# Returns the cached (completed processes, trace, extra) of a key, or None on a miss.
+# With need_trace an entry without a stored trace counts as a miss.
+def cached_result(cache, key, need_trace=False):
+    hit = cache.get(key)
+    if hit is None or (hit[1] is None and need_trace):
+        return None
+    columns, trace, extra = hit
+    return result_processes(columns), trace, extra
+
+
+# Runs one seeded run through a cache. run() returns (completed processes, trace, extra);
+# on a hit the stored ones are returned instead, and on a miss run() is called and its
+# result stored. With need_trace a hit without a stored trace counts as a miss. Without a
+# cache or a seed the run is not reproducible, so run() is simply called. digest is the
+# workload_digest of the workload, if already known.
+def cached_run(cache, workload, algorithm, params, seed, run, need_trace=False, digest=None):
+    if cache is None or seed is None:
+        return run()
+    key = result_key(workload_digest(workload) if digest is None else digest, algorithm, params, seed)
+    hit = cached_result(cache, key, need_trace)
+    if hit is not None:
+        return hit
+    processes, trace, extra = run()
+    cache.put(key, result_columns(processes), trace, extra)
+    return processes, trace, extra
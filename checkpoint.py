@@ -0,0 +1,132 @@
+# checkpoint.py
+import os
+import pickle
+import time
+from array import array
+
+from cache import workload_digest
+
+# Bump when the state a scheduler saves changes shape
+CHECKPOINT_VERSION = 1
+
+
+# Periodic snapshot file for a long scheduler run.
+# Pass checkpoint=Checkpoint(path) to srtf_scheduling or round_robin_scheduling. The run
+# saves its state to path at most every `interval` seconds of wall time, and a later run
+# with the same workload and parameters picks up from the saved state instead of starting
+# over. Snapshots are written to a temporary file and renamed into place, so a crash never
+# leaves a partial one behind. The file is deleted when the run finishes, unless keep is set.
+# Trace events from before the snapshot are not emitted again on resume.
+class Checkpoint:
+    def __init__(self, path, interval=60.0, keep=False):
+        self.path = path
+        self.interval = interval
+        self.keep = keep
+        self.next_save = time.monotonic() + interval
+        self.run = None
+        self.saves = 0
+        self.resumed = False
+
+    def due(self):
+        return time.monotonic() >= self.next_save
+
+    def save(self, state):
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, mode='wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        self.saves += 1
+        self.next_save = time.monotonic() + self.interval
+
+    # Returns the saved state, or None if there is no checkpoint yet
+    def load(self):
+        try:
+            with open(self.path, mode='rb') as file:
+                state = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"'{self.path}' is not a version {CHECKPOINT_VERSION} checkpoint")
+        return state
+
+    def finish(self):
+        if not self.keep:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    # Ties the checkpoint to a run: the algorithm, its parameters and the workload digest
+    # must match for a saved state to be resumed
+    def begin(self, algorithm, params, processes):
+        self.run = {"algorithm": algorithm, "params": params, "digest": workload_digest(processes)}
+
+    # Saves the state of the run at a dispatch point.
+    # processes are the run's arrival-sorted working copies, of which the first `admitted`
+    # have been admitted, and ready holds the waiting ones in queue order; completed_processes
+    # may include transient events. Per-process state is stored as int64 columns and
+    # processes are referred to by arrival index (transient events by -1 - their position
+    # in the transient list), so the file stays compact. extra holds any other scheduler state.
+    def save_state(self, current_time, processes, admitted, ready, completed_processes, events, rng, metrics,
+                   **extra):
+        admitted_processes = processes[:admitted]
+        positions = {id(process): index for index, process in enumerate(admitted_processes)}
+        transients = []
+        completed = array('q')
+        for process in completed_processes:
+            index = positions.get(id(process))
+            if index is None:
+                transients.append(process)
+                index = -len(transients)
+            completed.append(index)
+        self.save({
+            "version": CHECKPOINT_VERSION,
+            **self.run,
+            "current_time": current_time,
+            "admitted": admitted,
+            "ready": array('q', (positions[id(process)] for process in ready)),
+            "remaining": array('q', (process.remaining_duration for process in admitted_processes)),
+            "response_time": array('q', (process.response_time for process in admitted_processes)),
+            "completion_time": array('q', (process.completion_time for process in admitted_processes)),
+            "completed": completed,
+            "transients": transients,
+            "events": {name: value for name, value in vars(events).items() if name != "rng"},
+            "rng": rng.getstate(),
+            "metrics": metrics.get_state() if metrics is not None else None,
+            **extra,
+        })
+
+    # Loads the saved state into a fresh run and returns (state, ready processes in queue
+    # order, completed processes), or (None, None, None) if there is nothing to resume. The
+    # events cursor and rng must already have been started for the run; they are rewound
+    # to the saved point.
+    def resume(self, processes, events, rng, metrics):
+        state = self.load()
+        if state is None:
+            return None, None, None
+        if any(state[name] != value for name, value in self.run.items()):
+            raise ValueError(f"'{self.path}' is a checkpoint of a different run")
+
+        for process, remaining, response_time, completion_time in zip(
+                processes[:state["admitted"]], state["remaining"], state["response_time"], state["completion_time"]):
+            process.remaining_duration = remaining
+            process.response_time = response_time
+            process.completion_time = completion_time
+        completed_processes = []
+        for index in state["completed"]:
+            if index < 0:
+                completed_processes.append(state["transients"][-1 - index])
+                continue
+            process = processes[index]
+            process.turnaround_time = process.completion_time - process.arrival_time
+            process.waiting_time = process.turnaround_time - process.duration
+            completed_processes.append(process)
+
+        vars(events).update(state["events"])
+        rng.setstate(state["rng"])
+        if metrics is not None and state["metrics"] is not None:
+            metrics.set_state(state["metrics"])
+        self.resumed = True
+        return state, [processes[index] for index in state["ready"]], completed_processes
@@ -0,0 +1,138 @@
+# compare.py
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import cached_result, cached_run, result_key, workload_digest
+from process import ProcessTable, copy_column
+from scheduling import (fcfs_scheduling, sjf_scheduling, priority_scheduling, srtf_scheduling,
+                        round_robin_scheduling, cfs_scheduling, mlfq_scheduling)
+from stats import exact_quantile
+from tracing import NULL_SINK, TextTraceSink
+
+# Scheduling functions by the name used in comparison tables
+ALGORITHMS = {
+    "FCFS": fcfs_scheduling,
+    "SJF": sjf_scheduling,
+    "Priority": priority_scheduling,
+    "SRTF": srtf_scheduling,
+    "Round Robin": round_robin_scheduling,
+    "CFS": cfs_scheduling,
+    "MLFQ": mlfq_scheduling,
+}
+
+# The (algorithm, parameters) combinations main.py compares
+DEFAULT_RUNS = [
+    ("FCFS", {}),
+    ("SJF", {}),
+    ("Priority", {}),
+    ("SRTF", {}),
+    ("Round Robin", {"time_quantum": 2}),
+]
+
+# Workload installed in each worker process by _init_worker
+_worker_workload = None
+
+
+# Returns the four immutable columns of a workload as arrays, which pickle as flat buffers
+def workload_columns(workload):
+    if not isinstance(workload, ProcessTable):
+        workload = ProcessTable.from_processes(workload)
+    return tuple(copy_column(column) for column in
+                 (workload.pid, workload.arrival_time, workload.duration, workload.priority))
+
+
+# Receives the workload once per worker instead of once per task
+def _init_worker(columns):
+    global _worker_workload
+    _worker_workload = ProcessTable(*columns)
+    random.seed()  # Forked workers would otherwise all share the parent's random state
+
+
+# Runs one algorithm/parameter combination and reduces it to a result row.
+# With a seed the run uses its own random.Random(seed) instead of the random module, and
+# a cache.ResultCache, if given, is checked first (see cache.cached_run); digest is the
+# workload's workload_digest, if already known.
+def run_algorithm(workload, name, params, capture_trace=False, seed=None, cache=None, digest=None):
+    def run():
+        buffer = io.StringIO() if capture_trace else None
+        sink = TextTraceSink(buffer) if capture_trace else NULL_SINK
+        rng = random.Random(seed) if seed is not None else None
+        results = ALGORITHMS[name](workload, sink=sink, rng=rng, **params)
+        sink.flush()
+        return results, buffer.getvalue() if capture_trace else None, None
+
+    results, trace, _ = cached_run(cache, workload, name, params, seed, run, capture_trace, digest)
+    return result_row(name, params, results, trace if capture_trace else None)
+
+
+# Reduces the completed processes of a run to a result row: the averages plus the exact
+# median, p95, p99 and maximum of the waiting, turnaround and response times
+def result_row(name, params, processes, trace):
+    row = {"algorithm": name, "params": params, "processes": len(processes)}
+    columns = {metric: sorted(getattr(process, metric) for process in processes)
+               for metric in ("waiting_time", "turnaround_time", "response_time")}
+    for metric, values in columns.items():
+        row[f"avg_{metric}"] = sum(values) / len(values) if values else 0.0
+    for metric, values in columns.items():
+        row[f"{metric}_p50"] = exact_quantile(values, 0.5)
+        row[f"{metric}_p95"] = exact_quantile(values, 0.95)
+        row[f"{metric}_p99"] = exact_quantile(values, 0.99)
+        row[f"{metric}_max"] = values[-1] if values else 0
+    row["trace"] = trace
+    return row
+
+
+def _run_in_worker(name, params, capture_trace, seed, cache, digest):
+    return run_algorithm(_worker_workload, name, params, capture_trace, seed, cache, digest)
+
+
+# Runs every (algorithm, parameters) combination on the same workload in a process pool
+# and returns one result row per run, in the order given.
+# With capture_trace the console trace of each run is returned in its row instead of printed.
+# With a seed every run uses random.Random(seed), and a cache.ResultCache, if given, is
+# checked before each run is scheduled and stores the runs it misses.
+# Unseeded runs are not reproducible, so they never use the cache.
+def compare_algorithms(workload, runs=DEFAULT_RUNS, max_workers=None, capture_trace=False, seed=None, cache=None):
+    columns = workload_columns(workload)
+    rows = [None] * len(runs)
+    digest = None
+    if cache is not None and seed is not None:
+        # Answer the hits here, so a fully cached comparison starts no workers
+        digest = workload_digest(ProcessTable(*columns))
+        for index, (name, params) in enumerate(runs):
+            hit = cached_result(cache, result_key(digest, name, params, seed), capture_trace)
+            if hit is not None:
+                processes, trace, _ = hit
+                rows[index] = result_row(name, params, processes, trace if capture_trace else None)
+    pending = [index for index, row in enumerate(rows) if row is None]
+
+    if max_workers is None:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        table = ProcessTable(*columns)
+        for index in pending:
+            rows[index] = run_algorithm(table, *runs[index], capture_trace, seed, cache, digest)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(columns,)) as executor:
+            futures = [executor.submit(_run_in_worker, *runs[index], capture_trace, seed, cache, digest)
+                       for index in pending]
+            for index, future in zip(pending, futures):
+                rows[index] = future.result()
+    return rows
+
+
+# Prints the comparison table for a list of result rows
+def print_comparison(rows):
+    print("\n--- Comparison of Scheduling Algorithms ---")
+    print("{:<15} {:<20} {:<20} {:<18} {:<18} {:<20}".format(
+        "Algorithm", "Avg Waiting Time", "Avg Turnaround Time", "P95 Waiting Time", "P99 Waiting Time",
+        "Avg Response Time"))
+    print("-" * 116)
+    for row in rows:
+        print("{:<15} {:<20.2f} {:<20.2f} {:<18.2f} {:<18.2f} {:<20.2f}".format(
+            row["algorithm"], row["avg_waiting_time"], row["avg_turnaround_time"], row["waiting_time_p95"],
+            row["waiting_time_p99"], row["avg_response_time"]))
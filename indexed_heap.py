@@ -0,0 +1,100 @@
+# indexed_heap.py
+
+
+# Binary min-heap of distinct items that remembers where each item sits, so an item's key
+# can be lowered (decrease_key) or the item removed in O(log n) without searching for it.
+# Keys are compared with <, so tuples such as (priority, arrival index) work as they do
+# with heapq.
+class IndexedHeap:
+    def __init__(self):
+        self.keys = []
+        self.items = []
+        self.positions = {}  # Item -> index in keys/items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def key(self, item):
+        return self.keys[self.positions[item]]
+
+    # Returns (key, item) of the smallest key without removing it
+    def peek(self):
+        return self.keys[0], self.items[0]
+
+    def push(self, key, item):
+        if item in self.positions:
+            raise KeyError(f"{item!r} is already in the heap")
+        self.keys.append(key)
+        self.items.append(item)
+        self.positions[item] = len(self.items) - 1
+        self.sift_up(len(self.items) - 1)
+
+    # Removes and returns (key, item) of the smallest key
+    def pop(self):
+        key, item = self.keys[0], self.items[0]
+        self.remove_at(0)
+        return key, item
+
+    def remove(self, item):
+        self.remove_at(self.positions[item])
+
+    # Lowers the key of an item already in the heap
+    def decrease_key(self, item, key):
+        position = self.positions[item]
+        if self.keys[position] < key:
+            raise ValueError("decrease_key cannot raise a key")
+        self.keys[position] = key
+        self.sift_up(position)
+
+    def remove_at(self, position):
+        del self.positions[self.items[position]]
+        last_key = self.keys.pop()
+        last_item = self.items.pop()
+        if position < len(self.items):
+            # Move the last entry into the hole and restore the heap order around it
+            self.keys[position] = last_key
+            self.items[position] = last_item
+            self.positions[last_item] = position
+            self.sift_down(position)
+            self.sift_up(position)
+
+    def sift_up(self, position):
+        keys, items, positions = self.keys, self.items, self.positions
+        key, item = keys[position], items[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if not key < keys[parent]:
+                break
+            keys[position] = keys[parent]
+            items[position] = items[parent]
+            positions[items[position]] = position
+            position = parent
+        keys[position] = key
+        items[position] = item
+        positions[item] = position
+
+    def sift_down(self, position):
+        keys, items, positions = self.keys, self.items, self.positions
+        size = len(keys)
+        key, item = keys[position], items[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[child + 1] < keys[child]:
+                child += 1
+            if not keys[child] < key:
+                break
+            keys[position] = keys[child]
+            items[position] = items[child]
+            positions[items[position]] = position
+            position = child
+        keys[position] = key
+        items[position] = item
+        positions[item] = position
@@ -0,0 +1,104 @@
+# instrumentation.py
+import cProfile
+import pstats
+import time
+from collections import Counter
+
+
+# Counters and timers a scheduler fills in when it is given metrics=SchedulerMetrics().
+#
+# decisions counts dispatches (a collapsed run of Round Robin quanta is one decision),
+# context_switches counts dispatches of a different process than the one that last ran on
+# that CPU, and queue_time maps each ready-queue length to the simulated time spent at it.
+# With timing, the wall-clock time of picking the next process is added to selection_time;
+# the rest of the simulate phase is bookkeeping. Every scheduler times its "prepare"
+# (copying and sorting) and "simulate" phases with perf_counter, and with profile=True each
+# phase also runs under cProfile (see profile_stats).
+class SchedulerMetrics:
+    STATE_FIELDS = ("decisions", "preemptions", "context_switches", "queue_time", "max_queue_length",
+                    "queue_length", "queue_changed_at", "last_pid", "selection_time", "phase_times")
+
+    def __init__(self, timing=True, profile=False):
+        self.decisions = 0
+        self.preemptions = 0
+        self.context_switches = 0
+        self.queue_time = Counter()
+        self.max_queue_length = 0
+        self.queue_length = 0  # Ready-queue length since queue_changed_at
+        self.queue_changed_at = 0
+        self.last_pid = {}  # Process that last ran on each CPU
+        self.timing = timing
+        self.selection_time = 0.0
+        self.phase_times = Counter()
+        self.profile = profile
+        self.profiles = {}
+        self.phase_started = {}
+
+    def __repr__(self):
+        return (f"SchedulerMetrics(decisions={self.decisions}, preemptions={self.preemptions}, "
+                f"context_switches={self.context_switches}, mean_queue_length={self.mean_queue_length:.2f})")
+
+    # Records the ready-queue length from a simulated time onwards
+    def record_queue(self, time, length):
+        if time > self.queue_changed_at:
+            self.queue_time[self.queue_length] += time - self.queue_changed_at
+            self.queue_changed_at = time
+        self.queue_length = length
+        if length > self.max_queue_length:
+            self.max_queue_length = length
+
+    # Records a dispatch of pid at a simulated time with queue_length processes left waiting
+    # (None when the scheduler cannot tell)
+    def record_decision(self, time, pid, queue_length=None, cpu=0):
+        self.decisions += 1
+        if self.last_pid.get(cpu) != pid:
+            self.context_switches += 1
+            self.last_pid[cpu] = pid
+        if queue_length is not None:
+            self.record_queue(time, queue_length)
+
+    # Time-weighted mean ready-queue length
+    @property
+    def mean_queue_length(self):
+        total = sum(self.queue_time.values())
+        return sum(length * time for length, time in self.queue_time.items()) / total if total else 0.0
+
+    @property
+    def bookkeeping_time(self):
+        return self.phase_times["simulate"] - self.selection_time
+
+    # Counters and timers carried over when a checkpointed run resumes (see checkpoint.py)
+    def get_state(self):
+        return {name: getattr(self, name) for name in self.STATE_FIELDS}
+
+    def set_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def start_phase(self, name):
+        if self.profile:
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        self.phase_started[name] = time.perf_counter()
+
+    def end_phase(self, name):
+        self.phase_times[name] += time.perf_counter() - self.phase_started.pop(name)
+        if self.profile:
+            self.profiles[name].disable()
+
+    # pstats.Stats of a profiled phase, e.g. metrics.profile_stats("simulate").sort_stats("cumtime").print_stats(10)
+    def profile_stats(self, name):
+        return pstats.Stats(self.profiles[name])
+
+    def summary(self):
+        return {
+            "decisions": self.decisions,
+            "preemptions": self.preemptions,
+            "context_switches": self.context_switches,
+            "max_queue_length": self.max_queue_length,
+            "mean_queue_length": self.mean_queue_length,
+            "queue_length_histogram": dict(sorted(self.queue_time.items())),
+            "selection_time": self.selection_time,
+            "bookkeeping_time": self.bookkeeping_time,
+            "phase_times": dict(self.phase_times),
+        }
@@ -1,11 +1,19 @@
 # main.py
 
+import argparse
 import os
-from process import Process, generate_processes, save_processes_to_file, load_processes_from_file
-from scheduling import fcfs_scheduling, sjf_scheduling, priority_scheduling, srtf_scheduling, round_robin_scheduling
+from cache import ResultCache
+from process import Process, ProcessTable, generate_processes, save_processes_to_file, load_processes_from_file
+from compare import compare_algorithms, print_comparison
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Compare the scheduling algorithms on processes.csv.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the transient events, which makes the runs reproducible and cached")
+    parser.add_argument("--cache", default=".result_cache", help="result cache directory for seeded runs")
+    args = parser.parse_args()
+
     # Define the file where processes are saved
     filename = "processes.csv"
 
@@ -25,51 +33,20 @@ def main():
     for process in original_processes:
         print(process)
 
-    # First Come First Serve (FCFS)
-    print("\n--- FCFS Scheduling ---")
-    fcfs_results = fcfs_scheduling(original_processes)
-
-    # Shortest Job First (SJF)
-    print("\n--- SJF Scheduling ---")
-    sjf_results = sjf_scheduling(original_processes)
-
-    # Priority Scheduling
-    print("\n--- Priority Scheduling ---")
-    priority_results = priority_scheduling(original_processes)
+    # Store the workload column-wise so it is shipped to the worker processes as flat arrays
+    workload = ProcessTable.from_processes(original_processes)
 
-    # Shortest Remaining Time First (SRTF)
-    print("\n--- SRTF Scheduling ---")
-    srtf_results = srtf_scheduling(original_processes)
-
-    # Round Robin Scheduling (with a time quantum of 2 units)
-    print("\n--- Round Robin Scheduling ---")
-    rr_results = round_robin_scheduling(original_processes, time_quantum=2)
+    # Run FCFS, SJF, Priority, SRTF and Round Robin (time quantum of 2 units) in parallel,
+    # each on its own worker, and print their traces in order. Seeded runs are looked up in
+    # the result cache first.
+    cache = ResultCache(args.cache) if args.seed is not None else None
+    results = compare_algorithms(workload, capture_trace=True, seed=args.seed, cache=cache)
+    for row in results:
+        print(f"\n--- {row['algorithm']} Scheduling ---")
+        print(row["trace"], end="")
 
     # Compare all algorithms
-    # Calculate average metrics for each algorithm
-    avg_waiting_fcfs = sum(p.waiting_time for p in fcfs_results) / len(fcfs_results)
-    avg_turnaround_fcfs = sum(p.turnaround_time for p in fcfs_results) / len(fcfs_results)
-
-    avg_waiting_sjf = sum(p.waiting_time for p in sjf_results) / len(sjf_results)
-    avg_turnaround_sjf = sum(p.turnaround_time for p in sjf_results) / len(sjf_results)
-
-    avg_waiting_priority = sum(p.waiting_time for p in priority_results) / len(priority_results)
-    avg_turnaround_priority = sum(p.turnaround_time for p in priority_results) / len(priority_results)
-
-    avg_waiting_srtf = sum(p.waiting_time for p in srtf_results) / len(srtf_results)
-    avg_turnaround_srtf = sum(p.turnaround_time for p in srtf_results) / len(srtf_results)
-
-    avg_waiting_rr = sum(p.waiting_time for p in rr_results) / len(rr_results)
-    avg_turnaround_rr = sum(p.turnaround_time for p in rr_results) / len(rr_results)
-
-    print("\n--- Comparison of Scheduling Algorithms ---")
-    print("{:<15} {:<20} {:<20}".format("Algorithm", "Avg Waiting Time", "Avg Turnaround Time"))
-    print("-" * 60)
-    print("{:<15} {:<20.2f} {:<20.2f}".format("FCFS", avg_waiting_fcfs, avg_turnaround_fcfs))
-    print("{:<15} {:<20.2f} {:<20.2f}".format("SJF", avg_waiting_sjf, avg_turnaround_sjf))
-    print("{:<15} {:<20.2f} {:<20.2f}".format("Priority", avg_waiting_priority, avg_turnaround_priority))
-    print("{:<15} {:<20.2f} {:<20.2f}".format("SRTF", avg_waiting_srtf, avg_turnaround_srtf))
-    print("{:<15} {:<20.2f} {:<20.2f}".format("Round Robin", avg_waiting_rr, avg_turnaround_rr))
+    print_comparison(results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+# multicore.py
+import heapq
+import random
+from time import perf_counter
+
+from process import copy_processes
+from tracing import resolve_sink
+from transient import ONE_SHOT
+
+POLICIES = ("fcfs", "sjf", "priority", "srtf", "rr")
+DISPATCH_MODES = ("global", "per_core")
+BALANCE_MODES = (None, "least_loaded", "steal")
+
+
+# Per-core results of a multi-CPU run
+class MulticoreReport:
+    def __init__(self, num_cpus=1):
+        self.reset(num_cpus)
+
+    # Clears the report for a run on num_cpus cores
+    def reset(self, num_cpus):
+        self.num_cpus = num_cpus
+        self.busy_time = [0] * num_cpus  # Time each core spent running processes
+        self.dispatches = [0] * num_cpus  # Slices started on each core
+        self.preemptions = 0
+        self.steals = 0
+        self.makespan = 0  # Completion time of the last process
+
+    def __repr__(self):
+        return (f"MulticoreReport(num_cpus={self.num_cpus}, makespan={self.makespan}, "
+                f"mean_utilization={self.mean_utilization:.2%})")
+
+    # Fraction of the makespan each core was busy
+    @property
+    def utilization(self):
+        return [busy / self.makespan if self.makespan else 0.0 for busy in self.busy_time]
+
+    @property
+    def mean_utilization(self):
+        return sum(self.utilization) / self.num_cpus
+
+
+# Simulates a policy on num_cpus cores and returns (completed processes, MulticoreReport).
+#
+# policy is one of POLICIES; "rr" needs time_quantum and "srtf" preempts on arrivals.
+# dispatch="global" uses one shared ready heap: a freed core takes the best ready process.
+# dispatch="per_core" gives each core its own ready heap; arrivals are placed round-robin,
+# or on the core with the least queued work with balance="least_loaded", and with
+# balance="steal" an idle core with an empty queue takes the best process from the longest queue.
+#
+# The simulation is event driven: core slice ends sit in one heap, arrivals come through a
+# cursor over the arrival-sorted processes, and ready queues are heaps, so each event costs
+# O(log n) with global dispatch (SRTF finds the core to preempt through a heap of running
+# slices). least_loaded placement and stealing scan the cores, O(num_cpus) per placement or steal.
+# Transient events (see transient.py) are queued ahead of every other process and, once
+# started, run to completion. A preemptive event that finds no idle core takes over a core
+# that is not running another transient event, which costs a scan of the cores.
+# metrics, if given, is an instrumentation.SchedulerMetrics; its selection time covers
+# the whole dispatch step (placement, preemption checks and stealing).
+# report, if given, is a MulticoreReport to fill in (and return) instead of a new one.
+def simulate_multicore(original_processes, policy, num_cpus, time_quantum=None, dispatch="global", balance=None,
+                       sink=None, rng=None, transient_events=ONE_SHOT, metrics=None, report=None):
+    if num_cpus < 1:
+        raise ValueError(f"num_cpus must be at least 1, got {num_cpus}")
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+    if policy == "rr" and not time_quantum:
+        raise ValueError("Round Robin needs a time_quantum")
+    if dispatch not in DISPATCH_MODES or balance not in BALANCE_MODES:
+        raise ValueError(f"dispatch must be one of {DISPATCH_MODES} and balance one of {BALANCE_MODES}")
+    if balance is not None and dispatch != "per_core":
+        raise ValueError("balance only applies to per_core dispatch")
+
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    trace = sink.enabled
+    timing = metrics is not None and metrics.timing
+    if report is None:
+        report = MulticoreReport(num_cpus)
+    else:
+        report.reset(num_cpus)
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
+    # Create a copy of processes to avoid modifying the original list
+    processes = copy_processes(original_processes)
+    processes.sort(key=lambda x: x.arrival_time)
+    if metrics is not None:
+        metrics.end_phase("prepare")
+        metrics.start_phase("simulate")
+    total = len(processes)
+    cursor = 0  # Index of the next process to arrive
+
+    per_core = dispatch == "per_core"
+    queues = [[] for _ in range(num_cpus if per_core else 1)]  # Heaps of (key, index, process)
+    queued = 0
+    running = [None] * num_cpus  # (index, process) running on each core
+    slice_start = [0] * num_cpus
+    slice_end = [0] * num_cpus
+    version = [0] * num_cpus  # Bumped on every dispatch so stale slice-end events are skipped
+    slice_ends = []  # Heap of (end time, core, version)
+    longest = []  # SRTF with global dispatch: heap of (-end time, core, version) of running slices
+    idle = list(range(num_cpus))  # Global dispatch: heap of idle core ids, lowest id dispatched first
+    idle_set = set(idle)
+    next_core = 0  # Round-robin placement for per_core dispatch
+    rr_sequence = 0  # FIFO order for Round Robin
+    completed_processes = []
+
+    current_time = 0
+    events = transient_events.start(rng)
+    transient_count = 0  # Transient events are indexed from total up, in arrival order
+
+    # Key a process is queued under; lower runs first
+    def queue_key(process, index):
+        nonlocal rr_sequence
+        if policy == "fcfs":
+            return index
+        if policy == "sjf":
+            return process.duration
+        if policy == "priority":
+            return process.priority
+        if policy == "srtf":
+            return process.remaining_duration
+        rr_sequence += 1
+        return rr_sequence
+
+    # Places a ready process on a queue and returns that queue's core (0 for the global queue)
+    def enqueue(process, index, core=None, key=None):
+        nonlocal queued, next_core
+        if not per_core:
+            core = 0
+        elif core is None:
+            if balance == "least_loaded":
+                core = min(range(num_cpus), key=lambda c: len(queues[c]) + (running[c] is not None))
+            else:
+                core = next_core
+                next_core = (next_core + 1) % num_cpus
+        if key is None:
+            key = queue_key(process, index)
+        heapq.heappush(queues[core], (key, index, process))
+        queued += 1
+        return core
+
+    # Starts the next slice of a queued process on a core
+    def start(core, entry):
+        nonlocal queued
+        _, index, process = entry
+        queued -= 1
+        idle_set.discard(core)
+        length = process.remaining_duration
+        if length == process.duration:
+            process.response_time = current_time - process.arrival_time  # First time it runs
+        if policy == "rr" and index < total:
+            length = min(length, time_quantum)
+        running[core] = (index, process)
+        slice_start[core] = current_time
+        slice_end[core] = current_time + length
+        version[core] += 1
+        heapq.heappush(slice_ends, (slice_end[core], core, version[core]))
+        if policy == "srtf" and not per_core and index < total:
+            heapq.heappush(longest, (-(current_time + length), core, version[core]))
+        report.dispatches[core] += 1
+        if trace:
+            sink.emit("cpu_start", current_time, process.pid, cpu=core, remaining=process.remaining_duration)
+        if metrics is not None:
+            metrics.record_decision(current_time, process.pid, queued, core)
+
+    # Stops the slice running on a core at the current time; returns its (index, process)
+    def stop(core):
+        index, process = running[core]
+        ran = current_time - slice_start[core]
+        process.remaining_duration -= ran
+        report.busy_time[core] += ran
+        running[core] = None
+        version[core] += 1
+        return index, process
+
+    # Records a finished process
+    def complete(process, core):
+        process.completion_time = current_time
+        process.turnaround_time = process.completion_time - process.arrival_time
+        process.waiting_time = process.turnaround_time - process.duration
+        report.makespan = max(report.makespan, current_time)
+        if trace:
+            sink.emit("complete", current_time, process.pid, cpu=core, waiting_time=process.waiting_time,
+                      turnaround_time=process.turnaround_time)
+        completed_processes.append(process)
+
+    # Marks a core idle
+    def release(core):
+        if not per_core:
+            heapq.heappush(idle, core)
+        idle_set.add(core)
+
+    # Busy core a preemptive transient event takes over: the one whose slice ends last,
+    # skipping cores that already run a transient event. Returns None if there is none.
+    def interrupt_victim():
+        victim = None
+        for core in range(num_cpus):
+            if running[core] is not None and running[core][0] < total and (
+                    victim is None or slice_end[core] > slice_end[victim]):
+                victim = core
+        return victim
+
+    # Preempts a core for the given queue entry
+    def preempt(core, queue):
+        index, process = stop(core)
+        report.preemptions += 1
+        if metrics is not None:
+            metrics.preemptions += 1
+        if trace:
+            sink.emit("cpu_preempt", current_time, process.pid, cpu=core, remaining=process.remaining_duration)
+        enqueue(process, index, core)
+        start(core, heapq.heappop(queue))
+
+    while cursor < total or slice_ends or queued:
+        # Like the single-CPU schedulers, arrivals are only admitted at dispatch points: when a
+        # slice ends, or straight away if a core is idle (or SRTF may need to preempt)
+        next_arrival_time = float('inf')
+        if cursor < total and (idle_set or policy == "srtf"):
+            next_arrival_time = processes[cursor].arrival_time
+        current_time = min(next_arrival_time, slice_ends[0][0] if slice_ends else float('inf'))
+        if events.idle_wakeup:
+            current_time = min(current_time, events.next_time)
+        if current_time == float('inf'):
+            break
+        touched = set()  # Cores whose queue or state changed at this time
+
+        # End every slice that finishes now
+        while slice_ends and slice_ends[0][0] <= current_time:
+            _, core, slice_version = heapq.heappop(slice_ends)
+            if slice_version != version[core]:
+                continue
+            index, process = stop(core)
+            if process.remaining_duration == 0:
+                complete(process, core)
+            else:
+                if trace:
+                    sink.emit("cpu_quantum_expired", current_time, process.pid, cpu=core,
+                              remaining=process.remaining_duration)
+                enqueue(process, index, core)  # Round Robin quantum expired
+            release(core)
+            touched.add(core)
+
+        # Queue the transient events that are due; they go ahead of every queued process
+        while events.next_time <= current_time:
+            transient_process = events.pop(current_time, sink)
+            touched.add(enqueue(transient_process, total + transient_count, key=float('-inf')))
+            transient_count += 1
+
+        # Admit every process that has arrived by now
+        while cursor < total and processes[cursor].arrival_time <= current_time:
+            touched.add(enqueue(processes[cursor], cursor))
+            cursor += 1
+
+        if metrics is not None:
+            metrics.record_queue(current_time, queued)
+
+        # Dispatch idle cores
+        if timing:
+            selection_started = perf_counter()
+        if per_core:
+            for core in sorted(touched):
+                queue = queues[core]
+                if not queue:
+                    continue
+                if running[core] is None:
+                    start(core, heapq.heappop(queue))
+                elif running[core][0] >= total:
+                    continue  # Transient events run to completion
+                elif events.preemptive and queue[0][1] >= total:
+                    preempt(core, queue)
+                elif policy == "srtf":
+                    index, process = running[core]
+                    if queue[0][0] < process.remaining_duration - (current_time - slice_start[core]):
+                        preempt(core, queue)
+            if balance == "steal" and queued:
+                for core in sorted(idle_set):
+                    if queues[core]:
+                        start(core, heapq.heappop(queues[core]))
+                        continue
+                    victim = max(range(num_cpus), key=lambda c: len(queues[c]))
+                    if not queues[victim]:
+                        break
+                    report.steals += 1
+                    start(core, heapq.heappop(queues[victim]))
+        else:
+            queue = queues[0]
+            while queue and idle:
+                core = heapq.heappop(idle)
+                start(core, heapq.heappop(queue))
+            while events.preemptive and queue and queue[0][1] >= total:
+                core = interrupt_victim()
+                if core is None:
+                    break
+                preempt(core, queue)
+            if policy == "srtf":
+                while queue and longest:
+                    neg_end, core, slice_version = longest[0]
+                    if slice_version != version[core]:
+                        heapq.heappop(longest)
+                        continue
+                    if queue[0][0] >= -neg_end - current_time:
+                        break
+                    heapq.heappop(longest)
+                    preempt(core, queue)
+        if timing:
+            metrics.selection_time += perf_counter() - selection_started
+
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    if trace:
+        for core, utilization in enumerate(report.utilization):
+            sink.emit("cpu_utilization", None, cpu=core, utilization=utilization, busy_time=report.busy_time[core])
+        sink.emit("makespan", report.makespan)
+    return completed_processes, report
@@ -0,0 +1,335 @@
+# online.py
+import argparse
+import asyncio
+import heapq
+import json
+import sys
+import time
+from collections import deque
+
+from multicore import POLICIES
+from process import Process
+from scheduling import calculate_turnaround_time, calculate_waiting_time, print_process_info, print_stream_summary
+from stats import CompletionStats
+from tracing import NULL_SINK, TextTraceSink
+
+ALGORITHM_NAMES = {"fcfs": "FCFS", "sjf": "SJF", "priority": "Priority Scheduling", "srtf": "SRTF",
+                   "rr": "Round Robin"}
+
+
+# Incremental single-CPU scheduler for arrivals that are not known in advance.
+# submit() advances the simulated clock to the arrival, finishing every slice that ends
+# by then, then queues the process (preempting for SRTF), so each arrival and each
+# completion costs O(log n). The next process is only picked once the clock moves past an
+# instant, so every arrival at that instant is queued first, and ties go to the earliest
+# submission, as in the batch schedulers. A Round Robin process whose quantum expires goes
+# back in the queue ahead of the processes that arrived during that quantum, also as in
+# the batch version. Completed processes are folded into a CompletionStats and a rolling
+# window of the last `window` completions, and are not kept.
+class OnlineScheduler:
+    def __init__(self, policy, time_quantum=None, sink=None, window=1000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        if policy == "rr" and not time_quantum:
+            raise ValueError("Round Robin needs a time_quantum")
+        self.policy = policy
+        self.time_quantum = time_quantum
+        self.sink = NULL_SINK if sink is None else sink
+        self.current_time = 0
+        self.ready_heap = []  # Heap of (key, sequence, process)
+        self.sequence = 0  # Submission order, the tie-break and the Round Robin key
+        self.running = None
+        self.running_sequence = 0  # Sequence the running process is queued under if it stops
+        self.slice_start = 0
+        self.slice_end = 0
+        self.stats = CompletionStats()
+        self.recent = deque(maxlen=window)  # (waiting time, turnaround time) of the last completions
+        self.recent_waiting = 0
+        self.recent_turnaround = 0
+
+    # Key a process is queued under; lower runs first
+    def queue_key(self, process, sequence):
+        if self.policy == "sjf":
+            return process.duration
+        if self.policy == "priority":
+            return process.priority
+        if self.policy == "srtf":
+            return process.remaining_duration
+        return sequence  # FCFS and Round Robin
+
+    # Queues a process under its sequence, or the next one for a new arrival
+    def enqueue(self, process, sequence=None):
+        if sequence is None:
+            self.sequence += 1
+            sequence = self.sequence
+        heapq.heappush(self.ready_heap, (self.queue_key(process, sequence), sequence, process))
+
+    # Starts the best ready process at the current time, if any
+    def dispatch(self):
+        if not self.ready_heap:
+            return
+        _, sequence, process = heapq.heappop(self.ready_heap)
+        if self.policy == "rr":
+            # Behind everything queued so far, ahead of whatever arrives during the quantum
+            self.sequence += 1
+            sequence = self.sequence
+        self.running_sequence = sequence
+        length = process.remaining_duration
+        if length == process.duration:
+            process.response_time = self.current_time - process.arrival_time  # First time it runs
+        if self.policy == "rr":
+            length = min(length, self.time_quantum)
+        self.running = process
+        self.slice_start = self.current_time
+        self.slice_end = self.current_time + length
+        if self.sink.enabled:
+            self.sink.emit("slice", self.current_time, process.pid, remaining=process.remaining_duration)
+
+    # Stops the running process at the current time and returns it
+    def stop(self):
+        process = self.running
+        process.remaining_duration -= self.current_time - self.slice_start
+        self.running = None
+        return process
+
+    def complete(self, process):
+        process.completion_time = self.current_time
+        process.turnaround_time = calculate_turnaround_time(process)
+        process.waiting_time = calculate_waiting_time(process)
+        if self.sink.enabled:
+            print_process_info(process, self.sink)
+        self.stats.append(process)
+        if len(self.recent) == self.recent.maxlen:
+            waiting_time, turnaround_time = self.recent[0]
+            self.recent_waiting -= waiting_time
+            self.recent_turnaround -= turnaround_time
+        self.recent.append((process.waiting_time, process.turnaround_time))
+        self.recent_waiting += process.waiting_time
+        self.recent_turnaround += process.turnaround_time
+
+    # Runs the schedule forward to the given time. Slices that end by then are finished, but
+    # no process is started at `until` itself, as more arrivals may come at that instant.
+    def advance(self, until):
+        while True:
+            if self.running is None:
+                if not self.ready_heap or self.current_time >= until:
+                    break
+                self.dispatch()
+            if self.slice_end > until:
+                break
+            self.current_time = self.slice_end
+            process = self.stop()
+            if process.remaining_duration == 0:
+                self.complete(process)
+            else:
+                if self.sink.enabled:
+                    self.sink.emit("quantum_expired", self.current_time, process.pid,
+                                   remaining=process.remaining_duration)
+                self.enqueue(process, self.running_sequence)  # Round Robin quantum expired
+        if until > self.current_time:
+            self.current_time = until
+
+    # Accepts an arriving process. A process that arrives before the current time
+    # (a late or out-of-order arrival) is treated as arriving now.
+    def submit(self, process):
+        if process.arrival_time > self.current_time:
+            self.advance(process.arrival_time)
+        else:
+            process.arrival_time = self.current_time
+        self.enqueue(process)
+        if self.running is not None and self.policy == "srtf":
+            remaining = self.running.remaining_duration - (self.current_time - self.slice_start)
+            if process.remaining_duration < remaining:
+                preempted = self.stop()
+                if self.sink.enabled:
+                    self.sink.emit("preempt", self.current_time, preempted.pid,
+                                   remaining=preempted.remaining_duration)
+                self.enqueue(preempted, self.running_sequence)
+
+    # Runs every queued process to completion
+    def drain(self):
+        while self.running is not None or self.ready_heap:
+            if self.running is None:
+                self.dispatch()
+            self.advance(self.slice_end)
+
+    # Snapshot of the overall and rolling metrics
+    def metrics(self):
+        recent = len(self.recent)
+        return {
+            "time": self.current_time,
+            "completed": len(self.stats),
+            "queued": len(self.ready_heap),
+            "running": self.running.pid if self.running is not None else None,
+            "avg_waiting_time": self.stats.waiting_time.mean,
+            "avg_turnaround_time": self.stats.turnaround_time.mean,
+            "rolling_waiting_time": self.recent_waiting / recent if recent else 0.0,
+            "rolling_turnaround_time": self.recent_turnaround / recent if recent else 0.0,
+            "p95_waiting_time": self.stats.waiting_time.p95,
+            "p99_waiting_time": self.stats.waiting_time.p99,
+            "p99_turnaround_time": self.stats.turnaround_time.p99,
+            "avg_response_time": self.stats.response_time.mean,
+        }
+
+
+# Parses an arrival line: "pid,arrival_time,duration,priority" as in processes.csv.
+# An empty arrival_time means "now" and is stamped by the caller. Returns None for
+# the csv header and blank lines.
+def parse_arrival(line):
+    fields = [field.strip() for field in line.split(",")]
+    if not fields[0] or not fields[0].lstrip("-").isdigit():
+        return None
+    if len(fields) != 4:
+        raise ValueError(f"Expected pid,arrival_time,duration,priority, got '{line}'")
+    pid, arrival_time, duration, priority = fields
+    return Process(int(pid), int(arrival_time) if arrival_time else None, int(duration),
+                   int(priority) if priority else 0)
+
+
+# Reads a regular file, which the event loop cannot watch, with the StreamReader interface
+class FileLineReader:
+    def __init__(self, file):
+        self.file = file
+
+    async def readline(self):
+        await asyncio.sleep(0)  # Let the reporter run between lines
+        return self.file.readline()
+
+
+# Long-lived asyncio front end for an OnlineScheduler.
+# With ticks_per_second set, the simulated clock follows the wall clock: arrivals with no
+# arrival_time are stamped with the current tick and the schedule keeps running between
+# arrivals. Otherwise arrival times come from the input (replaying a recorded stream).
+class OnlineService:
+    def __init__(self, scheduler, ticks_per_second=None, report_interval=1.0, report=None):
+        self.scheduler = scheduler
+        self.ticks_per_second = ticks_per_second
+        self.report_interval = report_interval
+        self.report = report if report is not None else print_metrics
+        self.started = time.monotonic()
+
+    # Current simulated time according to the wall clock
+    def wall_ticks(self):
+        return int((time.monotonic() - self.started) * self.ticks_per_second)
+
+    # Handles one input line; returns a reply for the "stats" command, otherwise None
+    def handle_line(self, line):
+        line = line.strip()
+        if line == "stats":
+            return json.dumps(self.scheduler.metrics())
+        process = parse_arrival(line)
+        if process is None:
+            return None
+        if self.ticks_per_second:
+            now = self.wall_ticks()
+            self.scheduler.advance(now)
+            if process.arrival_time is None:
+                process.arrival_time = now
+        elif process.arrival_time is None:
+            process.arrival_time = self.scheduler.current_time
+        self.scheduler.submit(process)
+        return None
+
+    async def read_lines(self, reader, writer=None):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                reply = self.handle_line(line.decode())
+            except ValueError as error:
+                reply = f"error: {error}"
+            if reply is None:
+                continue
+            if writer is not None:
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+            else:
+                print(reply, file=sys.stderr)
+
+    # Reports the metrics every report_interval seconds, advancing the clock first in real-time mode
+    async def report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            if self.ticks_per_second:
+                self.scheduler.advance(self.wall_ticks())
+            self.scheduler.sink.flush()
+            self.report(self.scheduler.metrics())
+
+    # Serves arrivals from standard input until it closes, then drains the queue
+    async def serve_stdin(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        except ValueError:
+            reader = FileLineReader(sys.stdin.buffer)  # Redirected from a regular file
+        reporter = asyncio.create_task(self.report_loop())
+        try:
+            await self.read_lines(reader)
+        finally:
+            reporter.cancel()
+
+    # Serves arrivals from any number of TCP (host, port) or unix socket (path) clients until cancelled.
+    # Clients may also send "stats" to get the metrics back as a JSON line.
+    async def serve_socket(self, host=None, port=None, path=None):
+        async def handle_client(reader, writer):
+            try:
+                await self.read_lines(reader, writer)
+            finally:
+                writer.close()
+
+        if path is not None:
+            server = await asyncio.start_unix_server(handle_client, path=path)
+        else:
+            server = await asyncio.start_server(handle_client, host, port)
+        reporter = asyncio.create_task(self.report_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reporter.cancel()
+
+
+# Prints a one-line metrics report to standard error
+def print_metrics(metrics):
+    print("t={time} completed={completed} queued={queued} avg wait={avg_waiting_time:.2f} "
+          "avg turnaround={avg_turnaround_time:.2f} rolling wait={rolling_waiting_time:.2f} "
+          "rolling turnaround={rolling_turnaround_time:.2f} p95 wait={p95_waiting_time:.2f} "
+          "p99 wait={p99_waiting_time:.2f}".format(**metrics), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scheduling policy online over live process arrivals.")
+    parser.add_argument("--policy", choices=POLICIES, default="fcfs")
+    parser.add_argument("--quantum", type=int, default=2, help="Round Robin time quantum")
+    parser.add_argument("--listen", help="HOST:PORT to accept arrivals on instead of standard input")
+    parser.add_argument("--unix", help="unix socket path to accept arrivals on instead of standard input")
+    parser.add_argument("--realtime", type=float, metavar="TICKS_PER_SECOND",
+                        help="drive the clock from the wall clock at this many time units per second")
+    parser.add_argument("--window", type=int, default=1000, help="completions in the rolling metrics")
+    parser.add_argument("--report-interval", type=float, default=1.0, help="seconds between metric reports")
+    parser.add_argument("--trace", action="store_true", help="print the schedule as it runs")
+    args = parser.parse_args()
+
+    sink = TextTraceSink() if args.trace else NULL_SINK
+    scheduler = OnlineScheduler(args.policy, args.quantum, sink, args.window)
+    service = OnlineService(scheduler, args.realtime, args.report_interval)
+    try:
+        if args.listen or args.unix:
+            host, _, port = (args.listen or "").rpartition(":")
+            asyncio.run(service.serve_socket(host or None, int(port) if port else None, args.unix))
+        else:
+            asyncio.run(service.serve_stdin())
+    except KeyboardInterrupt:
+        pass
+
+    scheduler.drain()
+    summary_sink = sink if sink.enabled else TextTraceSink()
+    print_stream_summary(ALGORITHM_NAMES[args.policy], scheduler.stats, summary_sink)
+    summary_sink.flush()
+    print_metrics(scheduler.metrics())
+
+
+if __name__ == "__main__":
+    main()
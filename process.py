@@ -2,10 +2,18 @@
 import random
 import os
 import csv
+import mmap
+import struct
+import sys
+from array import array
+from tracing import emit_event
 
 
 # Process class for creating, randomizing and handling CPU processes
 class Process:
+    __slots__ = ("pid", "arrival_time", "duration", "priority", "remaining_duration", "completion_time",
+                 "turnaround_time", "waiting_time", "response_time", "next_execution_time")
+
     def __init__(self, pid, arrival_time, duration, priority=None):
         self.pid = pid  # Process ID
         self.arrival_time = arrival_time  # Arrival time of the process
@@ -15,6 +23,7 @@ class Process:
         self.completion_time = 0  # Time when the process completes
         self.turnaround_time = 0  # Turnaround time
         self.waiting_time = 0  # Waiting time
+        self.response_time = 0  # Time from arrival to first running
         self.next_execution_time = arrival_time # Used for SRTF
 
     def __repr__(self):
@@ -27,26 +36,114 @@ class Process:
         return new_process
 
 
-# Generates characteristics for random processes
-def generate_processes(num_processes):
+# Columnar (struct-of-arrays) storage for a workload: the pid, arrival_time, duration and
+# priority columns, stored as 64-bit integers.
+# Tables are for storing and shipping workloads (files, worker processes, the result
+# cache). Schedulers run on the Process objects to_processes builds, since attribute
+# access on a __slots__ Process is much cheaper than indexing columns for every field.
+class ProcessTable:
+    def __init__(self, pid, arrival_time, duration, priority):
+        self.pid = pid
+        self.arrival_time = arrival_time
+        self.duration = duration
+        self.priority = priority
+
+    def __len__(self):
+        return len(self.pid)
+
+    def __iter__(self):
+        return iter(self.to_processes())
+
+    # Builds a table from Process objects (a missing priority is stored as 0)
+    @classmethod
+    def from_processes(cls, processes):
+        return cls(array('q', [p.pid for p in processes]),
+                   array('q', [p.arrival_time for p in processes]),
+                   array('q', [p.duration for p in processes]),
+                   array('q', [0 if p.priority is None else p.priority for p in processes]))
+
+    # Returns a new table with the rows in stable arrival order
+    def sorted_by_arrival(self):
+        order = sorted(range(len(self)), key=self.arrival_time.__getitem__)
+        return ProcessTable(*(array('q', [column[i] for i in order])
+                              for column in (self.pid, self.arrival_time, self.duration, self.priority)))
+
+    # Converts the rows into standalone Process objects
+    def to_processes(self):
+        return [Process(pid, arrival_time, duration, priority) for pid, arrival_time, duration, priority
+                in zip(self.pid, self.arrival_time, self.duration, self.priority)]
+
+
+# Copies an int64 column (an array or a memoryview over a mapped file) into a new array
+def copy_column(column):
+    copy = array('q')
+    copy.frombytes(memoryview(column).cast('B'))
+    return copy
+
+
+# Returns working copies of a workload for one scheduling run: Process objects built
+# straight from a ProcessTable's columns, or clones of a list of Process objects
+def copy_processes(processes):
+    if isinstance(processes, ProcessTable):
+        return processes.to_processes()
+    return [process.clone() for process in processes]
+
+
+# Generates characteristics for random processes.
+# Pass a seeded random.Random as rng for a reproducible workload; the ranges are inclusive.
+def generate_processes(num_processes, rng=None, max_arrival_time=10, max_duration=10, max_priority=5):
+    rng = random if rng is None else rng
     processes = []
     for pid in range(1, num_processes + 1):
-        arrival_time = random.randint(0, 10)  # Random arrival time between 0 and 10
-        duration = random.randint(1, 10)  # Random duration between 1 and 10 units
-        priority = random.randint(1, 5)  # Random priority between 1 (high) and 5 (low)
+        arrival_time = rng.randint(0, max_arrival_time)  # Random arrival time between 0 and max_arrival_time
+        duration = rng.randint(1, max_duration)  # Random duration between 1 and max_duration units
+        priority = rng.randint(1, max_priority)  # Random priority between 1 (high) and max_priority (low)
         process = Process(pid, arrival_time, duration, priority)
         processes.append(process)
     return processes
 
 
-# Creates a transient event
-def create_transient_event(current_time):
+# Generates the same random workload as generate_processes, straight into a ProcessTable
+def generate_process_table(num_processes, rng=None, max_arrival_time=10, max_duration=10, max_priority=5):
+    rng = random if rng is None else rng
+    arrival_time = array('q')
+    duration = array('q')
+    priority = array('q')
+    for _ in range(num_processes):
+        arrival_time.append(rng.randint(0, max_arrival_time))
+        duration.append(rng.randint(1, max_duration))
+        priority.append(rng.randint(1, max_priority))
+    return ProcessTable(array('q', range(1, num_processes + 1)), arrival_time, duration, priority)
+
+
+# Generates a seeded workload lazily, as arrival-ordered ProcessTable chunks of chunk_size rows.
+# Arrival times grow by a random gap of 0..max_interarrival_time per process, so the stream
+# never has to be sorted and a workload of any size needs only one chunk in memory.
+def generate_process_stream(num_processes, rng=None, max_interarrival_time=1, max_duration=10, max_priority=5,
+                            chunk_size=65536):
+    rng = random if rng is None else rng
+    arrival = 0
+    for first in range(1, num_processes + 1, chunk_size):
+        last = min(first + chunk_size, num_processes + 1)
+        arrival_time = array('q')
+        duration = array('q')
+        priority = array('q')
+        for _ in range(first, last):
+            arrival += rng.randint(0, max_interarrival_time)
+            arrival_time.append(arrival)
+            duration.append(rng.randint(1, max_duration))
+            priority.append(rng.randint(1, max_priority))
+        yield ProcessTable(array('q', range(first, last)), arrival_time, duration, priority)
+
+
+# Creates a transient event, reporting it to the trace sink (console output by default)
+def create_transient_event(current_time, sink=None, rng=None):
+    rng = random if rng is None else rng
     new_pid = 999  # Special PID for transient event
-    duration = random.randint(1, 10)
-    priority = random.randint(1, 5)
+    duration = rng.randint(1, 10)
+    priority = rng.randint(1, 5)
     new_process = Process(new_pid, current_time + 1, duration, priority)
-    print(f"New transient event (process {new_process.pid}) arrived at time {current_time + 1}!")
-    print(f"Process Details: Duration={duration}, Priority={priority}")
+    emit_event(sink, "transient_arrival", current_time + 1, new_pid, duration=duration, priority=priority)
     return new_process
 
 
@@ -66,7 +163,7 @@ def load_processes_from_file(filename="processes.csv"):
     if os.path.exists(filename):  # Check if the file exists
         with open(filename, mode='r') as file:
             reader = csv.reader(file)
-            next(reader)  # Skip the header
+            next(reader, None)  # Skip the header (an empty file has none)
             for row in reader:
                 pid = int(row[0])
                 arrival_time = int(row[1])
@@ -76,4 +173,109 @@ def load_processes_from_file(filename="processes.csv"):
                 processes.append(process)
     else:
         print(f"File '{filename}' not found. Generating new processes.")
-    return processes
\ No newline at end of file
+    return processes
+
+
+# Binary workload format: a 16-byte header (magic, version, reserved, row count) followed
+# by the pid, arrival time, duration and priority columns as little-endian int64 arrays
+BINARY_MAGIC = b"CPUW"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHHQ")
+
+
+# Saves a workload (ProcessTable or list of Process objects) in the binary format
+def save_processes_to_binary(processes, filename="processes.cpuw"):
+    if not isinstance(processes, ProcessTable):
+        processes = ProcessTable.from_processes(processes)
+    with open(filename, mode='wb') as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(processes)))
+        for column in (processes.pid, processes.arrival_time, processes.duration, processes.priority):
+            column = copy_column(column)
+            if sys.byteorder == "big":
+                column.byteswap()
+            file.write(column.tobytes())
+
+
+# Loads a binary workload into a ProcessTable.
+# On little-endian machines the columns are memoryviews straight over a read-only mmap
+# of the file, so nothing is copied or parsed up front.
+def load_process_table_binary(filename="processes.cpuw"):
+    with open(filename, mode='rb') as file:
+        magic, version, _, count = BINARY_HEADER.unpack(file.read(BINARY_HEADER.size))
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"'{filename}' is not a version {BINARY_VERSION} binary workload file")
+        if count == 0:
+            return ProcessTable(array('q'), array('q'), array('q'), array('q'))
+        if os.fstat(file.fileno()).st_size < BINARY_HEADER.size + 32 * count:
+            raise ValueError(f"'{filename}' is truncated")
+        data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    columns = []
+    for index in range(4):
+        start = BINARY_HEADER.size + 8 * count * index
+        column = data[start:start + 8 * count].cast('q')
+        if sys.byteorder == "big":
+            column = copy_column(column)
+            column.byteswap()
+        columns.append(column)
+    return ProcessTable(*columns)
+
+
+# Converts a csv workload into the binary format row by row, without building Process objects
+def convert_csv_to_binary(csv_filename, binary_filename):
+    columns = (array('q'), array('q'), array('q'), array('q'))
+    with open(csv_filename, mode='r') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip the header (an empty file has none)
+        for row in reader:
+            for column, value in zip(columns, row):
+                column.append(int(value))
+    save_processes_to_binary(ProcessTable(*columns), binary_filename)
+
+
+# Loads a workload file of either format into a ProcessTable
+def load_process_table(filename):
+    with open(filename, mode='rb') as file:
+        is_binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if is_binary:
+        return load_process_table_binary(filename)
+    return ProcessTable.from_processes(load_processes_from_file(filename))
+
+
+# Streams a csv or binary workload file as ProcessTable chunks of chunk_size rows.
+# Binary chunks are slices of the memory-mapped columns; csv rows are parsed one chunk at a time.
+def stream_processes_from_file(filename, chunk_size=65536):
+    with open(filename, mode='rb') as file:
+        is_binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if is_binary:
+        table = load_process_table_binary(filename)
+        for start in range(0, len(table), chunk_size):
+            yield ProcessTable(*(column[start:start + chunk_size] for column in
+                                 (table.pid, table.arrival_time, table.duration, table.priority)))
+        return
+
+    with open(filename, mode='r') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip the header (an empty file has none)
+        columns = (array('q'), array('q'), array('q'), array('q'))
+        for row in reader:
+            for column, value in zip(columns, row):
+                column.append(int(value))
+            if len(columns[0]) == chunk_size:
+                yield ProcessTable(*columns)
+                columns = (array('q'), array('q'), array('q'), array('q'))
+        if len(columns[0]):
+            yield ProcessTable(*columns)
+
+
+# Turns a stream of ProcessTable chunks into Process objects one at a time,
+# checking that the stream is in arrival order
+def iter_stream_processes(stream):
+    last_arrival_time = None
+    for chunk in stream:
+        for pid, arrival_time, duration, priority in zip(chunk.pid, chunk.arrival_time, chunk.duration,
+                                                         chunk.priority):
+            if last_arrival_time is not None and arrival_time < last_arrival_time:
+                raise ValueError(f"Process stream is not sorted by arrival time at process {pid}")
+            last_arrival_time = arrival_time
+            yield Process(pid, arrival_time, duration, priority)
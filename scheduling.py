@@ -1,6 +1,14 @@
 # scheduling.py
+import heapq
 import random
-from process import create_transient_event
+from collections import deque
+from time import perf_counter
+from indexed_heap import IndexedHeap
+from process import copy_processes, iter_stream_processes
+from multicore import simulate_multicore
+from stats import CompletionStats, MetricSummary
+from tracing import emit_event, resolve_sink
+from transient import ONE_SHOT
 
 
 # Utility function to calculate waiting time
@@ -13,73 +21,112 @@ def calculate_turnaround_time(process):
     return process.completion_time - process.arrival_time
 
 
-# Utility function to print process details
-def print_process_info(process):
-    print(f"Process {process.pid} completed at time {process.completion_time}, "
-          f"Waiting Time: {process.waiting_time}, Turnaround Time: {process.turnaround_time}")
+# Utility function to print process details (or send them to a trace sink)
+def print_process_info(process, sink=None):
+    emit_event(sink, "complete", process.completion_time, process.pid,
+               waiting_time=process.waiting_time, turnaround_time=process.turnaround_time)
 
 
-# Utility function to print algorithm summary
-def print_algorithm_summary(algorithm_name, processes):
-    total_waiting_time = sum(process.waiting_time for process in processes)
-    total_turnaround_time = sum(process.turnaround_time for process in processes)
-    avg_waiting_time = total_waiting_time / len(processes)
-    avg_turnaround_time = total_turnaround_time / len(processes)
+# Utility function to calculate average waiting and turnaround time in a single pass
+def calculate_average_times(processes):
+    total_waiting_time = 0
+    total_turnaround_time = 0
+    for process in processes:
+        total_waiting_time += process.waiting_time
+        total_turnaround_time += process.turnaround_time
+    return total_waiting_time / len(processes), total_turnaround_time / len(processes)
 
-    print(f"\n--- {algorithm_name} Summary ---")
-    print(f"Average Waiting Time: {avg_waiting_time:.2f}")
-    print(f"Average Turnaround Time: {avg_turnaround_time:.2f}")
+
+# Utility function to print algorithm summary (or send it to a trace sink)
+def print_algorithm_summary(algorithm_name, processes, sink=None):
+    if sink is not None and not sink.enabled:
+        return
+    avg_waiting_time, avg_turnaround_time = calculate_average_times(processes)
+
+    emit_event(sink, "summary", None, algorithm=algorithm_name,
+               avg_waiting_time=avg_waiting_time, avg_turnaround_time=avg_turnaround_time)
+
+
+# Runs a policy on several CPUs (see multicore.simulate_multicore) and prints its summary
+def run_multicore(algorithm_name, policy, original_processes, num_cpus, dispatch, balance, sink, rng,
+                  transient_events, metrics, report, time_quantum=None):
+    completed_processes, _ = simulate_multicore(original_processes, policy, num_cpus, time_quantum=time_quantum,
+                                                dispatch=dispatch, balance=balance, sink=sink, rng=rng,
+                                                transient_events=transient_events, metrics=metrics, report=report)
+    print_algorithm_summary(algorithm_name, completed_processes, sink)
+    sink.flush()
+    return completed_processes
+
+
+# Fills a multicore.MulticoreReport for a single-CPU run: the CPU was busy for the duration
+# of every completed process (transient events included) and the makespan is the last completion
+def fill_single_cpu_report(report, completed_processes):
+    report.reset(1)
+    report.busy_time[0] = sum(process.duration for process in completed_processes)
+    report.makespan = max((process.completion_time for process in completed_processes), default=0)
+
+
+# Utility function that takes no trace fields from a process
+def no_detail(process):
+    return {}
 
 
 # FCFS (First Come First Served) Scheduling
-def fcfs_scheduling(original_processes):
+# With num_cpus > 1 every scheduler runs on that many cores instead, with global or
+# per-core ready queues (dispatch) and optional load balancing (balance); report, if given,
+# is a multicore.MulticoreReport to fill in with per-core utilization and the makespan
+# (dispatch, preemption and steal counts are only kept by multi-CPU runs). num_cpus below
+# 1 raises ValueError.
+# transient_events is the transient-event model (see transient.py); the default is the
+# original one-shot event. metrics, if given, is an instrumentation.SchedulerMetrics to fill in.
+def fcfs_scheduling(original_processes, sink=None, rng=None, num_cpus=1, dispatch="global", balance=None,
+                    transient_events=ONE_SHOT, metrics=None, report=None):
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    if num_cpus != 1:
+        return run_multicore("FCFS", "fcfs", original_processes, num_cpus, dispatch, balance, sink, rng,
+                             transient_events, metrics, report)
+    trace = sink.enabled
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
     # Create a copy of processes to avoid modifying the original list
-    processes = [process.clone() for process in original_processes]
+    processes = copy_processes(original_processes)
     processes.sort(key=lambda x: x.arrival_time)  # Sort by arrival time
+    if metrics is not None:
+        metrics.end_phase("prepare")
+        metrics.start_phase("simulate")
 
     current_time = 0
-    event_time = random.randint(5, 15)  # Set a single event time for this run
-    transient_event_triggered = False
-    transient_process = None
+    events = transient_events.start(rng)
     completed_processes = []
+    arrived = 0  # Processes that have arrived, for the ready-queue length
 
     i = 0
     while i < len(processes):
-        # Check if the transient event should be triggered (only once)
-        if not transient_event_triggered and current_time >= event_time:
-            # Create the transient event
-            transient_process = create_transient_event(current_time)
-
-            # Set the arrival time to the current time
-            transient_process.arrival_time = current_time
-
-            # Immediately process the transient event before continuing
-            if current_time < transient_process.arrival_time:
-                current_time = transient_process.arrival_time
-
-            print(f"Starting Transient Process {transient_process.pid} at time {current_time}")
-            transient_process.completion_time = current_time + transient_process.duration
-            transient_process.turnaround_time = calculate_turnaround_time(transient_process)
-            transient_process.waiting_time = calculate_waiting_time(transient_process)
-
-            # Update current time
-            current_time = transient_process.completion_time
-            print_process_info(transient_process)
-            completed_processes.append(transient_process)
-
-            # Mark the transient event as triggered
-            transient_event_triggered = True
+        # Run any transient events that are due
+        current_time = run_transient_events(current_time, events, completed_processes, sink, metrics=metrics)
 
         # Handle regular processes
         process = processes[i]
         # Ensure process starts when it arrives
         if current_time < process.arrival_time:
+            if events.idle_wakeup and events.next_time <= process.arrival_time:
+                current_time = events.next_time
+                continue
             current_time = process.arrival_time
+        process.response_time = current_time - process.arrival_time
 
-        print(f"Starting Process {process.pid} at time {current_time}")
+        if trace:
+            sink.emit("start", current_time, process.pid)
+        if metrics is not None:
+            while arrived < len(processes) and processes[arrived].arrival_time <= current_time:
+                arrived += 1
+            metrics.record_decision(current_time, process.pid, arrived - i - 1)
 
         # Calculate completion time
-        process.completion_time = current_time + process.duration
+        process.completion_time = run_with_interrupts(current_time, process.duration, process, events,
+                                                      completed_processes, sink, metrics=metrics)
         process.turnaround_time = calculate_turnaround_time(process)
         process.waiting_time = calculate_waiting_time(process)
 
@@ -87,336 +134,863 @@ def fcfs_scheduling(original_processes):
         current_time = process.completion_time
 
         # Print process info
-        print_process_info(process)
+        if trace:
+            print_process_info(process, sink)
         completed_processes.append(process)
         i += 1
 
-    print_algorithm_summary("FCFS", completed_processes)
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    if report is not None:
+        fill_single_cpu_report(report, completed_processes)
+    print_algorithm_summary("FCFS", completed_processes, sink)
+    sink.flush()
     return completed_processes
 
 
-# SJF (Shortest Job First) Scheduling
-def sjf_scheduling(original_processes):
+# Runs every transient event that is due by the current time to completion, back to back,
+# ahead of the ready queue. events is the run's transient-event cursor (see transient.py).
+def run_transient_events(current_time, events, completed_processes, sink, describe=no_detail, metrics=None):
+    while events.next_time <= current_time:
+        # Create the transient event
+        transient_process = events.pop(current_time, sink)
+        if metrics is not None:
+            metrics.record_decision(current_time, transient_process.pid, metrics.queue_length)
+
+        transient_process.response_time = current_time - transient_process.arrival_time
+        transient_process.completion_time = current_time + transient_process.duration
+        transient_process.turnaround_time = calculate_turnaround_time(transient_process)
+        transient_process.waiting_time = calculate_waiting_time(transient_process)
+
+        if sink.enabled:
+            sink.emit("transient_start", current_time, transient_process.pid, **describe(transient_process))
+            print_process_info(transient_process, sink)
+        completed_processes.append(transient_process)
+        current_time = transient_process.completion_time
+
+    # Return the updated current time
+    return current_time
+
+
+# Runs `work` time units of a process from the current time and returns when they are done.
+# Preemptive transient events that arrive meanwhile interrupt it and run first.
+def run_with_interrupts(current_time, work, process, events, completed_processes, sink, describe=no_detail,
+                        metrics=None):
+    end = current_time + work
+    while events.preemptive and events.next_time < end:
+        interrupted_time = events.next_time
+        if sink.enabled:
+            sink.emit("preempt", interrupted_time, process.pid, remaining=end - interrupted_time)
+        if metrics is not None:
+            metrics.preemptions += 1
+        resumed_time = run_transient_events(interrupted_time, events, completed_processes, sink, describe, metrics)
+        if sink.enabled:
+            sink.emit("resume", resumed_time, process.pid, **describe(process))
+        if metrics is not None:
+            metrics.record_decision(resumed_time, process.pid, metrics.queue_length)
+        end += resumed_time - interrupted_time
+    return end
+
+
+# Shared event-driven kernel for SJF, Priority and SRTF scheduling.
+# Arrivals are admitted through a cursor over the arrival-sorted processes into a
+# binary heap keyed by (key(process), arrival index), so ties still go to the
+# earliest arrival and a whole run costs O(n log n) instead of O(n^2).
+# describe(process) returns the extra fields traced with each dispatch.
+# With aging_interval set, a waiting process's key drops by one for every aging_interval
+# time units it has waited, but not below aging_floor (keys already at or below it do not
+# age). The ready heap is then an IndexedHeap and a second heap holds the time each
+# waiting process next ages, so every aging step is one O(log n) decrease-key instead of
+# a rescan of the ready set.
+# checkpoint, if given, is a begun checkpoint.Checkpoint the run resumes from and saves to
+# (not combined with aging).
+def heap_scheduling_kernel(original_processes, key, sink, rng, preemptive=False, describe=no_detail,
+                           transient_events=ONE_SHOT, metrics=None, aging_interval=None, aging_floor=1,
+                           checkpoint=None):
+    trace = sink.enabled
+    timing = metrics is not None and metrics.timing
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
     # Create a copy of processes to avoid modifying the original list
-    processes = [process.clone() for process in original_processes]
+    processes = copy_processes(original_processes)
+    processes.sort(key=lambda x: x.arrival_time)  # Stable sort keeps input order for ties
+    if metrics is not None:
+        metrics.end_phase("prepare")
+        metrics.start_phase("simulate")
 
     current_time = 0
-    event_time = random.randint(5, 15)  # Set a single event time for this run
-    transient_event_triggered = False
-    remaining_processes = sorted(processes, key=lambda x: x.arrival_time)
+    events = transient_events.start(rng)
+    aging = aging_interval is not None
+    ready_heap = IndexedHeap() if aging else []
+    cursor = 0  # Index of the next process to arrive
+    total = len(processes)
     completed_processes = []
-
-    while remaining_processes:
-        # Check if the transient event should be triggered (only once)
-        if not transient_event_triggered and current_time >= event_time:
-            # Create the transient event
-            transient_process = create_transient_event(current_time)
-
-            # Set the arrival time to the current time
-            transient_process.arrival_time = current_time
-
-            # Immediately process the transient event before continuing
-            if current_time < transient_process.arrival_time:
-                current_time = transient_process.arrival_time
-
-            print(f"Starting Transient Process {transient_process.pid} at time {current_time}")
-            transient_process.completion_time = current_time + transient_process.duration
-            transient_process.turnaround_time = calculate_turnaround_time(transient_process)
-            transient_process.waiting_time = calculate_waiting_time(transient_process)
-
-            # Update current time
-            current_time = transient_process.completion_time
-            print_process_info(transient_process)
-            completed_processes.append(transient_process)
-
-            # Mark the transient event as triggered
-            transient_event_triggered = True
-
-        # Get available processes at the current time
-        available_processes = [p for p in remaining_processes if p.arrival_time <= current_time]
-
-        # No available processes - jump to next arrival time
-        if not available_processes:
-            current_time = min(p.arrival_time for p in remaining_processes)
+    start_kind = "resume" if preemptive else "start"
+    aging_heap = []  # Heap of (time the key next drops, arrival index, start of that wait)
+    wait_started = [0] * total if aging else None
+
+    # Queues a process whose key ages from wait_start onwards
+    def enqueue_aging(index, wait_start):
+        base_key = key(processes[index])
+        ready_heap.push((base_key, index), index)
+        wait_started[index] = wait_start
+        if base_key > aging_floor:
+            heapq.heappush(aging_heap, (wait_start + aging_interval, index, wait_start))
+
+    # Lowers the key of every waiting process that is due to age by the current time
+    def age_ready_processes():
+        while aging_heap and aging_heap[0][0] <= current_time:
+            _, index, wait_start = heapq.heappop(aging_heap)
+            if index not in ready_heap or wait_started[index] != wait_start:
+                continue  # Dispatched since this step was scheduled
+            steps = (current_time - wait_start) // aging_interval
+            aged_key = max(aging_floor, key(processes[index]) - steps)
+            ready_heap.decrease_key(index, (aged_key, index))
+            if aged_key > aging_floor:
+                heapq.heappush(aging_heap, (wait_start + (steps + 1) * aging_interval, index, wait_start))
+            if trace:
+                sink.emit("aged", current_time, processes[index].pid, key=aged_key)
+
+    if checkpoint is not None:
+        state, ready, resumed = checkpoint.resume(processes, events, rng, metrics)
+        if state is not None:
+            current_time = state["current_time"]
+            cursor = state["admitted"]
+            ready_heap = [(key(process), index) for process, index in zip(ready, state["ready"])]
+            heapq.heapify(ready_heap)
+            completed_processes = resumed
+
+    while cursor < total or ready_heap:
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save_state(current_time, processes, cursor, [processes[index] for _, index in ready_heap],
+                                  completed_processes, events, rng, metrics)
+
+        # Run any transient events that are due
+        current_time = run_transient_events(current_time, events, completed_processes, sink, describe, metrics)
+
+        # Admit every process that has arrived by the current time
+        while cursor < total and processes[cursor].arrival_time <= current_time:
+            if aging:
+                enqueue_aging(cursor, processes[cursor].arrival_time)
+            else:
+                heapq.heappush(ready_heap, (key(processes[cursor]), cursor))
+            cursor += 1
+        if aging:
+            age_ready_processes()
+        if metrics is not None:
+            metrics.record_queue(current_time, len(ready_heap))
+
+        # No available processes - jump to the next arrival time (or transient event)
+        if not ready_heap:
+            current_time = processes[cursor].arrival_time
+            if events.idle_wakeup:
+                current_time = min(current_time, events.next_time)
             continue
 
-        # Select process with the shortest duration among the available processes
-        next_process = min(available_processes, key=lambda x: x.duration)
-        print(f"Starting Process {next_process.pid} at time {current_time}")
+        # Select the available process with the smallest key
+        if timing:
+            selection_started = perf_counter()
+        _, index = ready_heap.pop() if aging else heapq.heappop(ready_heap)
+        if timing:
+            metrics.selection_time += perf_counter() - selection_started
+        next_process = processes[index]
+        if not preemptive or next_process.remaining_duration == next_process.duration:
+            next_process.response_time = current_time - next_process.arrival_time  # First time it runs
+        if trace:
+            sink.emit(start_kind, current_time, next_process.pid, **describe(next_process))
+        if metrics is not None:
+            metrics.record_decision(current_time, next_process.pid, len(ready_heap))
+
+        if preemptive:
+            next_arrival_time = processes[cursor].arrival_time if cursor < total else float('inf')
+            if events.preemptive:
+                next_arrival_time = min(next_arrival_time, events.next_time)
+            if next_arrival_time < current_time + next_process.remaining_duration:
+                # Process will be preempted by the next arrival or transient event
+                next_process.remaining_duration -= next_arrival_time - current_time
+                current_time = next_arrival_time
+                if trace:
+                    sink.emit("preempt", current_time, next_process.pid, remaining=next_process.remaining_duration)
+                if metrics is not None:
+                    metrics.preemptions += 1
+                if aging:
+                    enqueue_aging(index, current_time)
+                else:
+                    heapq.heappush(ready_heap, (key(next_process), index))
+                continue
 
-        # Calculate completion time for the selected process
-        next_process.completion_time = current_time + next_process.duration
+            # Process will complete
+            current_time += next_process.remaining_duration
+            next_process.remaining_duration = 0
+        else:
+            current_time = run_with_interrupts(current_time, next_process.duration, next_process, events,
+                                               completed_processes, sink, describe, metrics)
+
+        next_process.completion_time = current_time
         next_process.turnaround_time = calculate_turnaround_time(next_process)
         next_process.waiting_time = calculate_waiting_time(next_process)
 
-        # Update current time
-        current_time = next_process.completion_time
-
         # Print process info
-        print_process_info(next_process)
-
-        # Move process from remaining to completed
-        remaining_processes.remove(next_process)
+        if trace:
+            print_process_info(next_process, sink)
         completed_processes.append(next_process)
 
-    print_algorithm_summary("SJF", completed_processes)
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    if checkpoint is not None:
+        checkpoint.finish()
     return completed_processes
 
 
-# Priority Scheduling
-def priority_scheduling(original_processes):
-    # Create a copy of processes to avoid modifying the original list
-    processes = [process.clone() for process in original_processes]
-
-    current_time = 0
-    event_time = random.randint(5, 15)  # Set a single event time for this run
-    transient_event_triggered = False
-    remaining_processes = sorted(processes, key=lambda x: x.arrival_time)
-    completed_processes = []
+# SJF (Shortest Job First) Scheduling
+def sjf_scheduling(original_processes, sink=None, rng=None, num_cpus=1, dispatch="global", balance=None,
+                   transient_events=ONE_SHOT, metrics=None, report=None):
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    if num_cpus != 1:
+        return run_multicore("SJF", "sjf", original_processes, num_cpus, dispatch, balance, sink, rng,
+                             transient_events, metrics, report)
+    completed_processes = heap_scheduling_kernel(original_processes, lambda x: x.duration, sink, rng,
+                                                 transient_events=transient_events, metrics=metrics)
+    if report is not None:
+        fill_single_cpu_report(report, completed_processes)
+    print_algorithm_summary("SJF", completed_processes, sink)
+    sink.flush()
+    return completed_processes
 
-    while remaining_processes:
-        # Check if the transient event should be triggered (only once)
-        if not transient_event_triggered and current_time >= event_time:
-            # Create the transient event
-            transient_process = create_transient_event(current_time)
 
-            # Set the arrival time to the current time
-            transient_process.arrival_time = current_time
+# Priority Scheduling
+# With aging_interval set, a waiting process gains one priority level (its number drops by
+# one) for every aging_interval time units it waits, up to aging_floor, so low-priority
+# processes cannot starve. Aging is only simulated on a single CPU.
+def priority_scheduling(original_processes, sink=None, rng=None, num_cpus=1, dispatch="global", balance=None,
+                        transient_events=ONE_SHOT, metrics=None, aging_interval=None, aging_floor=1, report=None):
+    if aging_interval is not None and (aging_interval < 1 or num_cpus > 1):
+        raise ValueError("aging_interval must be a positive time on a single CPU")
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    if num_cpus != 1:
+        return run_multicore("Priority Scheduling", "priority", original_processes, num_cpus, dispatch, balance,
+                             sink, rng, transient_events, metrics, report)
+    # Highest priority is the lowest number
+    completed_processes = heap_scheduling_kernel(original_processes, lambda x: x.priority, sink, rng,
+                                                 describe=lambda x: {"priority": x.priority},
+                                                 transient_events=transient_events, metrics=metrics,
+                                                 aging_interval=aging_interval, aging_floor=aging_floor)
+    if report is not None:
+        fill_single_cpu_report(report, completed_processes)
+    print_algorithm_summary("Priority Scheduling", completed_processes, sink)
+    sink.flush()
+    return completed_processes
 
-            # Immediately process the transient event before continuing
-            if current_time < transient_process.arrival_time:
-                current_time = transient_process.arrival_time
 
-            print(
-                f"Starting Transient Process {transient_process.pid} (Priority {transient_process.priority}) at time {current_time}")
-            transient_process.completion_time = current_time + transient_process.duration
-            transient_process.turnaround_time = calculate_turnaround_time(transient_process)
-            transient_process.waiting_time = calculate_waiting_time(transient_process)
+# SRTF (Shortest Remaining Time First) Scheduling
+# checkpoint, if given, is a checkpoint.Checkpoint: the run resumes from its file when it
+# holds a snapshot of the same run, and saves snapshots to it as it goes (single CPU only).
+def srtf_scheduling(original_processes, sink=None, rng=None, num_cpus=1, dispatch="global", balance=None,
+                    transient_events=ONE_SHOT, metrics=None, checkpoint=None, report=None):
+    if checkpoint is not None and num_cpus > 1:
+        raise ValueError("checkpoints are only supported on a single CPU")
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    if num_cpus != 1:
+        return run_multicore("SRTF", "srtf", original_processes, num_cpus, dispatch, balance, sink, rng,
+                             transient_events, metrics, report)
+    if sink.enabled:
+        sink.emit("header", None, title="SRTF (Shortest Remaining Time First) Scheduling")
+    if checkpoint is not None:
+        checkpoint.begin("SRTF", {"transient_events": repr(transient_events)}, original_processes)
+
+    completed_processes = heap_scheduling_kernel(original_processes, lambda x: x.remaining_duration, sink, rng,
+                                                 preemptive=True,
+                                                 describe=lambda x: {"remaining": x.remaining_duration},
+                                                 transient_events=transient_events, metrics=metrics,
+                                                 checkpoint=checkpoint)
+    if report is not None:
+        fill_single_cpu_report(report, completed_processes)
+    print_algorithm_summary("SRTF", completed_processes, sink)
+    sink.flush()
+    return completed_processes
 
-            # Update current time
-            current_time = transient_process.completion_time
-            print_process_info(transient_process)
-            completed_processes.append(transient_process)
 
-            # Mark the transient event as triggered
-            transient_event_triggered = True
+# Round Robin Scheduling
+# checkpoint works as for srtf_scheduling.
+def round_robin_scheduling(original_processes, time_quantum, sink=None, rng=None, num_cpus=1, dispatch="global",
+                           balance=None, transient_events=ONE_SHOT, metrics=None, checkpoint=None, report=None):
+    if checkpoint is not None and num_cpus > 1:
+        raise ValueError("checkpoints are only supported on a single CPU")
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    if num_cpus != 1:
+        return run_multicore("Round Robin", "rr", original_processes, num_cpus, dispatch, balance, sink, rng,
+                             transient_events, metrics, report, time_quantum=time_quantum)
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
+    # Create a copy of processes to avoid modifying the original list
+    processes = copy_processes(original_processes)
 
-        # Get available processes at current time
-        available_processes = [p for p in remaining_processes if p.arrival_time <= current_time]
+    if sink.enabled:
+        sink.emit("header", None, title=f"Round Robin Scheduling (Time Quantum = {time_quantum})")
 
-        if not available_processes:
-            # Jump to the next arrival time if no processes are available
-            current_time = min(p.arrival_time for p in remaining_processes)
-            continue
+    # Sort processes by arrival time
+    processes.sort(key=lambda x: x.arrival_time)
+    if checkpoint is not None:
+        checkpoint.begin("Round Robin", {"time_quantum": time_quantum, "transient_events": repr(transient_events)},
+                         original_processes)
+    if metrics is not None:
+        metrics.end_phase("prepare")
+
+    completed_processes, _ = round_robin_kernel(processes, time_quantum, sink, rng,
+                                                transient_events=transient_events, metrics=metrics,
+                                                checkpoint=checkpoint)
+    if report is not None:
+        fill_single_cpu_report(report, completed_processes)
+    print_algorithm_summary("Round Robin", completed_processes, sink)
+    sink.flush()
+    return completed_processes
 
-        # Select process with the highest priority (lowest number) among the available processes
-        next_process = min(available_processes, key=lambda x: x.priority)
 
-        print(f"Starting Process {next_process.pid} (Priority {next_process.priority}) at time {current_time}")
+# Round Robin kernel over processes that are already copied and sorted by arrival time.
+# processes can be any iterable, including a stream; arrivals are pulled from it one at a
+# time and the ready queue is a deque, so each dispatch is O(1). When only one process is
+# ready, consecutive quanta up to the next arrival or transient event are collapsed into
+# a single step. Completed processes are appended to completed_processes (a new list by
+# default). Returns completed_processes and the number of context switches.
+# checkpoint, if given, is a begun checkpoint.Checkpoint; processes must then be a list.
+def round_robin_kernel(processes, time_quantum, sink, rng, completed_processes=None, transient_events=ONE_SHOT,
+                       metrics=None, checkpoint=None):
+    trace = sink.enabled
+    timing = metrics is not None and metrics.timing
+    if metrics is not None:
+        metrics.start_phase("simulate")
 
-        # Calculate completion time
-        next_process.completion_time = current_time + next_process.duration
-        next_process.turnaround_time = calculate_turnaround_time(next_process)
-        next_process.waiting_time = calculate_waiting_time(next_process)
+    current_time = 0
+    events = transient_events.start(rng)
 
-        # Update current time
-        current_time = next_process.completion_time
+    # Create a ready queue
+    ready_queue = deque()
+    if completed_processes is None:
+        completed_processes = []
+    arrivals = iter(processes)
+    upcoming = next(arrivals, None)  # Next process to arrive
+    admitted = 0  # Processes moved to the ready queue so far
+    last_process = None  # Process that ran most recently
+    context_switches = 0
+
+    if checkpoint is not None:
+        state, ready, resumed = checkpoint.resume(processes, events, rng, metrics)
+        if state is not None:
+            current_time = state["current_time"]
+            admitted = state["admitted"]
+            arrivals = iter(processes[admitted:])
+            upcoming = next(arrivals, None)
+            ready_queue.extend(ready)
+            completed_processes.extend(resumed)
+            if state["last_process"] == "ready":
+                last_process = ready_queue[-1]
+            elif state["last_process"] == "completed":
+                last_process = completed_processes[-1]
+            context_switches = state["context_switches"]
+
+    while upcoming is not None or ready_queue:
+        if checkpoint is not None and checkpoint.due():
+            # The last process to run is either back at the tail of the queue or just completed
+            if last_process is None:
+                last = None
+            elif ready_queue and ready_queue[-1] is last_process:
+                last = "ready"
+            else:
+                last = "completed"
+            checkpoint.save_state(current_time, processes, admitted, ready_queue, completed_processes, events, rng,
+                                  metrics, last_process=last, context_switches=context_switches)
 
-        # Print process info
-        print_process_info(next_process)
+        # Run any transient events that are due
+        if events.next_time <= current_time:
+            completed_before = len(completed_processes)
+            current_time = run_transient_events(current_time, events, completed_processes, sink, metrics=metrics)
+            last_process = None
+            context_switches += len(completed_processes) - completed_before
 
-        # Move process from remaining to completed
-        remaining_processes.remove(next_process)
-        completed_processes.append(next_process)
+        # Move arrived processes to the ready queue
+        while upcoming is not None and upcoming.arrival_time <= current_time:
+            ready_queue.append(upcoming)
+            upcoming = next(arrivals, None)
+            admitted += 1
+        if metrics is not None:
+            metrics.record_queue(current_time, len(ready_queue))
+
+        # If ready queue is empty, jump to the next arrival time (or transient event)
+        if not ready_queue:
+            current_time = upcoming.arrival_time
+            if events.idle_wakeup:
+                current_time = min(current_time, events.next_time)
+            continue
 
-    print_algorithm_summary("Priority Scheduling", completed_processes)
-    return completed_processes
+        # Get the next process from the ready queue
+        if timing:
+            selection_started = perf_counter()
+        current_process = ready_queue.popleft()
+        if timing:
+            metrics.selection_time += perf_counter() - selection_started
+        if current_process is not last_process:
+            context_switches += 1
+            last_process = current_process
+
+        if trace:
+            sink.emit("slice", current_time, current_process.pid, remaining=current_process.remaining_duration)
+        if metrics is not None:
+            metrics.record_decision(current_time, current_process.pid, len(ready_queue))
+
+        remaining = current_process.remaining_duration
+        if remaining == current_process.duration:
+            current_process.response_time = current_time - current_process.arrival_time  # First time it runs
+        quanta = 1
+        if not ready_queue and remaining > time_quantum:
+            # Nothing else is ready, so keep running this process until it finishes
+            # or reaches the next arrival or transient event, whichever is first
+            boundary = upcoming.arrival_time if upcoming is not None else float('inf')
+            boundary = min(boundary, events.next_time)
+            quanta = -(-remaining // time_quantum)  # Quanta needed to finish
+            if boundary != float('inf'):
+                quanta = min(quanta, -(-(boundary - current_time) // time_quantum))
+
+        if remaining <= quanta * time_quantum:
+            # Process will complete within these quanta
+            current_process.remaining_duration = 0
+            current_time = run_with_interrupts(current_time, remaining, current_process, events,
+                                               completed_processes, sink, metrics=metrics)
+            current_process.completion_time = current_time
+            current_process.turnaround_time = calculate_turnaround_time(current_process)
+            current_process.waiting_time = calculate_waiting_time(current_process)
 
+            # Print process info
+            if trace:
+                print_process_info(current_process, sink)
 
-# SRTF (Shortest Remaining Time First) Scheduling
-def srtf_scheduling(original_processes):
+            # Add to completed processes
+            completed_processes.append(current_process)
+        else:
+            # Process will use the full time quanta
+            current_process.remaining_duration -= quanta * time_quantum
+            current_time = run_with_interrupts(current_time, quanta * time_quantum, current_process, events,
+                                               completed_processes, sink, metrics=metrics)
+            if metrics is not None:
+                metrics.preemptions += 1  # The quantum timer preempts it
+
+            if trace:
+                if quanta == 1:
+                    sink.emit("quantum_expired", current_time, current_process.pid,
+                              remaining=current_process.remaining_duration)
+                else:
+                    sink.emit("quanta_expired", current_time, current_process.pid, quanta=quanta,
+                              remaining=current_process.remaining_duration)
+
+            # Add back to ready queue
+            ready_queue.append(current_process)
+
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    if checkpoint is not None:
+        checkpoint.finish()
+    return completed_processes, context_switches
+
+
+
+# Load weights of the Linux nice levels -20..19, each level about 10% less CPU than the one before
+NICE_0_WEIGHT = 1024
+NICE_WEIGHTS = (
+    88761, 71755, 56483, 46273, 36291, 29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906, 3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423, 335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45, 36, 29, 23, 18, 15,
+)
+
+
+# CFS weight of a process: its priority is used as the nice value (lower runs more), clamped to -20..19
+def cfs_weight(process):
+    nice = 0 if process.priority is None else min(max(process.priority, -20), 19)
+    return NICE_WEIGHTS[nice + 20]
+
+
+# CFS (Completely Fair Scheduler) style Scheduling
+# Runnable processes sit in a heap keyed by (virtual runtime, arrival index), so picking the
+# leftmost process and re-inserting it are O(log n). A process runs for its share of
+# target_latency (weight / total runnable weight, at least min_granularity) and its virtual
+# runtime advances by the time it ran scaled by NICE_0_WEIGHT / weight, so higher-weight
+# processes get proportionally more CPU. Arrivals start at the queue's minimum virtual
+# runtime and wait for the running slice to end. When only one process is runnable,
+# consecutive slices up to the next arrival or transient event are collapsed into one step.
+def cfs_scheduling(original_processes, sink=None, rng=None, target_latency=20, min_granularity=2,
+                   transient_events=ONE_SHOT, metrics=None):
+    if min_granularity < 1 or target_latency < min_granularity:
+        raise ValueError("CFS needs 1 <= min_granularity <= target_latency")
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    trace = sink.enabled
+    timing = metrics is not None and metrics.timing
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
     # Create a copy of processes to avoid modifying the original list
-    processes = [process.clone() for process in original_processes]
+    processes = copy_processes(original_processes)
+    processes.sort(key=lambda x: x.arrival_time)  # Stable sort keeps input order for ties
+    if metrics is not None:
+        metrics.end_phase("prepare")
+        metrics.start_phase("simulate")
 
-    print("\n--- SRTF (Shortest Remaining Time First) Scheduling ---")
+    if trace:
+        sink.emit("header", None, title=f"CFS (Completely Fair Scheduler) Scheduling (Target Latency = "
+                                        f"{target_latency}, Minimum Granularity = {min_granularity})")
 
     current_time = 0
-    event_time = random.randint(5, 15)  # Set a single event time for this run
-    transient_event_triggered = False
-    remaining_processes = sorted(processes, key=lambda x: x.arrival_time)
+    events = transient_events.start(rng)
+    ready_heap = []  # Heap of (virtual runtime, arrival index)
+    weights = []  # Weight of each admitted process, by arrival index
+    total_weight = 0  # Weight of every runnable process, including the running one
+    min_vruntime = 0.0  # Never decreases, so late arrivals cannot starve the others
+    cursor = 0  # Index of the next process to arrive
+    total = len(processes)
     completed_processes = []
 
-    while remaining_processes:
-        # Check if the transient event should be triggered (only once)
-        if not transient_event_triggered and current_time >= event_time:
-            # Create the transient event
-            transient_process = create_transient_event(current_time)
-
-            # Set the arrival time to the current time
-            transient_process.arrival_time = current_time
-
-            # Immediately process the transient event before continuing
-            if current_time < transient_process.arrival_time:
-                current_time = transient_process.arrival_time
-
-            print(
-                f"Starting Transient Process {transient_process.pid} (Remaining: {transient_process.remaining_duration}) at time {current_time}")
-            transient_process.completion_time = current_time + transient_process.duration
-            transient_process.turnaround_time = calculate_turnaround_time(transient_process)
-            transient_process.waiting_time = calculate_waiting_time(transient_process)
-
-            # Update current time
-            current_time = transient_process.completion_time
-            print_process_info(transient_process)
-            completed_processes.append(transient_process)
-
-            # Mark the transient event as triggered
-            transient_event_triggered = True
-
-        # Get available processes at current time
-        available_processes = [p for p in remaining_processes if p.arrival_time <= current_time]
-
-        if not available_processes:
-            # Jump to the next arrival time if no processes are available
-            current_time = min(p.arrival_time for p in remaining_processes)
+    while cursor < total or ready_heap:
+        # Run any transient events that are due
+        current_time = run_transient_events(current_time, events, completed_processes, sink, metrics=metrics)
+
+        # Admit every process that has arrived by the current time
+        while cursor < total and processes[cursor].arrival_time <= current_time:
+            weight = cfs_weight(processes[cursor])
+            weights.append(weight)
+            total_weight += weight
+            heapq.heappush(ready_heap, (min_vruntime, cursor))
+            cursor += 1
+        if metrics is not None:
+            metrics.record_queue(current_time, len(ready_heap))
+
+        # No runnable processes - jump to the next arrival time (or transient event)
+        if not ready_heap:
+            current_time = processes[cursor].arrival_time
+            if events.idle_wakeup:
+                current_time = min(current_time, events.next_time)
             continue
 
-        # Select process with shortest remaining time from the available processes
-        next_process = min(available_processes, key=lambda x: x.remaining_duration)
-
-        print(
-            f"Starting/Resuming Process {next_process.pid} (Remaining: {next_process.remaining_duration}) at time {current_time}")
-
-        # Determine the time until the next process arrival
-        next_arrival_time = float('inf')
-        for p in remaining_processes:
-            if p.arrival_time > current_time:
-                next_arrival_time = min(next_arrival_time, p.arrival_time)
-
-        # Determine how long this process will run
-        if next_arrival_time != float('inf') and next_arrival_time < current_time + next_process.remaining_duration:
-            # Process will be preempted by a new arrival
-            time_slice = next_arrival_time - current_time
-            next_process.remaining_duration -= time_slice
-            current_time = next_arrival_time
-            print(
-                f"Process {next_process.pid} preempted at time {current_time}, remaining: {next_process.remaining_duration}")
-        else:
-            # Process will complete
-            current_time += next_process.remaining_duration
-            next_process.remaining_duration = 0
-            next_process.completion_time = current_time
-            next_process.turnaround_time = calculate_turnaround_time(next_process)
-            next_process.waiting_time = calculate_waiting_time(next_process)
+        # Pick the process with the smallest virtual runtime
+        if timing:
+            selection_started = perf_counter()
+        vruntime, index = heapq.heappop(ready_heap)
+        if timing:
+            metrics.selection_time += perf_counter() - selection_started
+        current_process = processes[index]
+        weight = weights[index]
+
+        if trace:
+            sink.emit("slice", current_time, current_process.pid, remaining=current_process.remaining_duration)
+        if metrics is not None:
+            metrics.record_decision(current_time, current_process.pid, len(ready_heap))
+
+        remaining = current_process.remaining_duration
+        if remaining == current_process.duration:
+            current_process.response_time = current_time - current_process.arrival_time  # First time it runs
+        time_slice = max(min_granularity, target_latency * weight // total_weight)
+        slices = 1
+        if not ready_heap and remaining > time_slice:
+            # Nothing else is runnable, so keep running this process until it finishes
+            # or reaches the next arrival or transient event, whichever is first
+            boundary = processes[cursor].arrival_time if cursor < total else float('inf')
+            boundary = min(boundary, events.next_time)
+            slices = -(-remaining // time_slice)  # Slices needed to finish
+            if boundary != float('inf'):
+                slices = min(slices, -(-(boundary - current_time) // time_slice))
+        ran = min(remaining, slices * time_slice)
+
+        current_process.remaining_duration -= ran
+        current_time = run_with_interrupts(current_time, ran, current_process, events, completed_processes, sink,
+                                           metrics=metrics)
+        vruntime += ran * NICE_0_WEIGHT / weight
+        min_vruntime = max(min_vruntime, min(vruntime, ready_heap[0][0]) if ready_heap else vruntime)
+
+        if current_process.remaining_duration == 0:
+            # Process completed within its slice
+            total_weight -= weight
+            current_process.completion_time = current_time
+            current_process.turnaround_time = calculate_turnaround_time(current_process)
+            current_process.waiting_time = calculate_waiting_time(current_process)
 
             # Print process info
-            print_process_info(next_process)
-
-            # Move process from remaining to completed
-            remaining_processes.remove(next_process)
-            completed_processes.append(next_process)
-
-    print_algorithm_summary("SRTF", completed_processes)
+            if trace:
+                print_process_info(current_process, sink)
+            completed_processes.append(current_process)
+        else:
+            if metrics is not None:
+                metrics.preemptions += 1  # The slice timer preempts it
+            if trace:
+                if slices == 1:
+                    sink.emit("quantum_expired", current_time, current_process.pid,
+                              remaining=current_process.remaining_duration)
+                else:
+                    sink.emit("quanta_expired", current_time, current_process.pid, quanta=slices,
+                              remaining=current_process.remaining_duration)
+
+            # Put it back in the tree at its new virtual runtime
+            heapq.heappush(ready_heap, (vruntime, index))
+
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    print_algorithm_summary("CFS", completed_processes, sink)
+    sink.flush()
     return completed_processes
 
 
-# Round Robin Scheduling
-def round_robin_scheduling(original_processes, time_quantum):
+# MLFQ (Multi-Level Feedback Queue) Scheduling
+# quanta gives the time quantum of each level, top level first. Arrivals enter the top
+# level; a process that uses its whole quantum moves down a level (the bottom level is
+# Round Robin), and the highest non-empty level always runs next. Every boost_interval
+# time units (None to never boost) every waiting process moves back to the top level so
+# long jobs cannot starve. Levels are FIFO queues, so pick-next and re-queue are O(1) in
+# the number of processes, and a boost moves whole queues rather than processes: the top
+# level is a chain of queues served in order, and a boost appends the lower levels to it.
+# As in Round Robin, arrivals wait for the running quantum to end, and when only one
+# process is ready its quanta up to the next arrival, transient event or boost are
+# collapsed into one step.
+def mlfq_scheduling(original_processes, sink=None, rng=None, quanta=(2, 4, 8), boost_interval=100,
+                    transient_events=ONE_SHOT, metrics=None):
+    if not quanta or min(quanta) < 1:
+        raise ValueError("MLFQ needs at least one level and positive time quanta")
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    trace = sink.enabled
+    timing = metrics is not None and metrics.timing
+
+    if metrics is not None:
+        metrics.start_phase("prepare")
     # Create a copy of processes to avoid modifying the original list
-    processes = [process.clone() for process in original_processes]
+    processes = copy_processes(original_processes)
+    processes.sort(key=lambda x: x.arrival_time)
+    if metrics is not None:
+        metrics.end_phase("prepare")
+        metrics.start_phase("simulate")
 
-    print(f"\n--- Round Robin Scheduling (Time Quantum = {time_quantum}) ---")
+    if trace:
+        sink.emit("header", None, title=f"MLFQ (Multi-Level Feedback Queue) Scheduling (Time Quanta = "
+                                        f"{', '.join(map(str, quanta))}, Boost Interval = {boost_interval})")
 
     current_time = 0
-    event_time = random.randint(5, 15)  # Set a single event time for this run
-    transient_event_triggered = False
-
-    # Sort processes by arrival time
-    processes.sort(key=lambda x: x.arrival_time)
-
-    # Create a ready queue
-    ready_queue = []
+    events = transient_events.start(rng)
+    bottom = len(quanta) - 1
+    top_level = deque([deque()])  # Chain of queues; arrivals join the last one
+    levels = [top_level] + [deque() for _ in range(bottom)]
+    ready_count = 0
+    next_boost = boost_interval if boost_interval else float('inf')
+    cursor = 0  # Index of the next process to arrive
+    total = len(processes)
     completed_processes = []
-    remaining_processes = processes.copy()
-
-    while remaining_processes or ready_queue:
-        # Check if the transient event should be triggered (only once)
-        if not transient_event_triggered and current_time >= event_time:
-            # Create the transient event
-            transient_process = create_transient_event(current_time)
-
-            # Set the arrival time to the current time
-            transient_process.arrival_time = current_time
-
-            # Immediately process the transient event before continuing
-            if current_time < transient_process.arrival_time:
-                current_time = transient_process.arrival_time
-
-            print(f"Starting Transient Process {transient_process.pid} at time {current_time}")
-            transient_process.completion_time = current_time + transient_process.duration
-            transient_process.turnaround_time = calculate_turnaround_time(transient_process)
-            transient_process.waiting_time = calculate_waiting_time(transient_process)
-
-            # Update current time
-            current_time = transient_process.completion_time
-            print_process_info(transient_process)
-            completed_processes.append(transient_process)
-
-            # Mark the transient event as triggered
-            transient_event_triggered = True
-
-        # Move arrived processes to the ready queue
-        i = 0
-        while i < len(remaining_processes):
-            if remaining_processes[i].arrival_time <= current_time:
-                process = remaining_processes.pop(i)
-                ready_queue.append(process)
-            else:
-                i += 1
 
-        # If ready queue is empty, jump to the next arrival time
-        if not ready_queue and remaining_processes:
-            current_time = min(p.arrival_time for p in remaining_processes)
+    # Moves every process below the top level to the end of the top level
+    def boost():
+        nonlocal next_boost
+        moved = 0
+        for level in range(1, bottom + 1):
+            if levels[level]:
+                moved += len(levels[level])
+                top_level.append(levels[level])  # Later arrivals join behind it
+                levels[level] = deque()
+        next_boost = (current_time // boost_interval + 1) * boost_interval
+        if trace and moved:
+            sink.emit("boost", current_time, moved=moved)
+
+    def enqueue(process, level):
+        if level == 0:
+            top_level[-1].append(process)
+        else:
+            levels[level].append(process)
+
+    while cursor < total or ready_count:
+        # Run any transient events that are due
+        current_time = run_transient_events(current_time, events, completed_processes, sink, metrics=metrics)
+        if current_time >= next_boost:
+            boost()
+
+        # Move arrived processes to the top level
+        while cursor < total and processes[cursor].arrival_time <= current_time:
+            top_level[-1].append(processes[cursor])
+            ready_count += 1
+            cursor += 1
+        if metrics is not None:
+            metrics.record_queue(current_time, ready_count)
+
+        # If nothing is ready, jump to the next arrival time (or transient event)
+        if not ready_count:
+            current_time = processes[cursor].arrival_time
+            if events.idle_wakeup:
+                current_time = min(current_time, events.next_time)
             continue
 
-        if ready_queue:
-            # Get the next process from the ready queue
-            current_process = ready_queue.pop(0)
+        # Take the first process of the highest non-empty level
+        if timing:
+            selection_started = perf_counter()
+        while not top_level[0] and len(top_level) > 1:
+            top_level.popleft()
+        if top_level[0]:
+            level = 0
+            current_process = top_level[0].popleft()
+        else:
+            level = 1
+            while not levels[level]:
+                level += 1
+            current_process = levels[level].popleft()
+        ready_count -= 1
+        if timing:
+            metrics.selection_time += perf_counter() - selection_started
+
+        if trace:
+            sink.emit("slice", current_time, current_process.pid, remaining=current_process.remaining_duration,
+                      level=level)
+        if metrics is not None:
+            metrics.record_decision(current_time, current_process.pid, ready_count)
+
+        remaining = current_process.remaining_duration
+        if remaining == current_process.duration:
+            current_process.response_time = current_time - current_process.arrival_time  # First time it runs
+
+        # Run one quantum, or while nothing else is ready, one quantum per level on the way
+        # down until the process finishes or reaches the next arrival, transient event or boost
+        if ready_count:
+            boundary = current_time
+        else:
+            boundary = processes[cursor].arrival_time if cursor < total else float('inf')
+            boundary = min(boundary, events.next_time, next_boost)
+        ran = 0
+        slices = 0
+        while True:
+            if remaining - ran <= quanta[level]:
+                ran = remaining  # Completes within this quantum
+                break
+            ran += quanta[level]
+            slices += 1
+            level = min(level + 1, bottom)  # Used the whole quantum, so move down a level
+            if current_time + ran >= boundary:
+                break
+            if level == bottom:
+                # Round Robin on the bottom level, as many quanta as it takes
+                left = remaining - ran
+                count = -(-left // quanta[bottom])
+                if boundary != float('inf'):
+                    count = min(count, -(-(boundary - current_time - ran) // quanta[bottom]))
+                if left <= count * quanta[bottom]:
+                    ran = remaining
+                else:
+                    ran += count * quanta[bottom]
+                    slices += count
+                break
+
+        current_process.remaining_duration -= ran
+        current_time = run_with_interrupts(current_time, ran, current_process, events, completed_processes, sink,
+                                           metrics=metrics)
+
+        if current_process.remaining_duration == 0:
+            current_process.completion_time = current_time
+            current_process.turnaround_time = calculate_turnaround_time(current_process)
+            current_process.waiting_time = calculate_waiting_time(current_process)
 
-            print(
-                f"Starting/Resuming Process {current_process.pid} at time {current_time} (Remaining: {current_process.remaining_duration})")
+            # Print process info
+            if trace:
+                print_process_info(current_process, sink)
+            completed_processes.append(current_process)
+        else:
+            if metrics is not None:
+                metrics.preemptions += 1  # The quantum timer preempts it
+            if trace:
+                if slices == 1:
+                    sink.emit("quantum_expired", current_time, current_process.pid,
+                              remaining=current_process.remaining_duration, level=level)
+                else:
+                    sink.emit("quanta_expired", current_time, current_process.pid, quanta=slices,
+                              remaining=current_process.remaining_duration, level=level)
+
+            # A boost that came due while it ran moves it back to the top as well
+            if current_time >= next_boost:
+                boost()
+                level = 0
+            enqueue(current_process, level)
+            ready_count += 1
+
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    print_algorithm_summary("MLFQ", completed_processes, sink)
+    sink.flush()
+    return completed_processes
 
-            # Normal process scheduling using time quantum
-            if current_process.remaining_duration <= time_quantum:
-                # Process will complete within this time quantum
-                time_slice = current_process.remaining_duration
-                current_process.remaining_duration = 0
-                current_process.completion_time = current_time + time_slice
-                current_process.turnaround_time = calculate_turnaround_time(current_process)
-                current_process.waiting_time = calculate_waiting_time(current_process)
 
-                # Print process info
-                print_process_info(current_process)
+# Sends the summary of a streamed run to the trace sink
+def print_stream_summary(algorithm_name, stats, sink):
+    if sink.enabled and len(stats):
+        sink.emit("summary", None, algorithm=algorithm_name, avg_waiting_time=stats.waiting_time.mean,
+                  avg_turnaround_time=stats.turnaround_time.mean)
+
+
+# FCFS over a stream of arrival-ordered ProcessTable chunks (see process.generate_process_stream
+# and process.stream_processes_from_file). Completed processes are folded into a
+# CompletionStats and dropped, so memory stays constant however long the stream is.
+# progress(stats) is called every progress_every completions; the final stats are returned.
+# quantiles are the percentiles the stats track (pass () to keep only the means and maxima).
+# The ready-queue length is not known without looking ahead in the stream, so metrics
+# only get decisions, preemptions, context switches and the simulate phase time.
+def stream_fcfs_scheduling(stream, sink=None, rng=None, progress=None, progress_every=100000,
+                           transient_events=ONE_SHOT, metrics=None, quantiles=MetricSummary.QUANTILES):
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+    trace = sink.enabled
+    if metrics is not None:
+        metrics.start_phase("simulate")
 
-                # Add to completed processes
-                completed_processes.append(current_process)
-            else:
-                # Process will use the full time quantum
-                time_slice = time_quantum
-                current_process.remaining_duration -= time_quantum
+    current_time = 0
+    events = transient_events.start(rng)
+    stats = CompletionStats(progress, progress_every, quantiles)
 
-                print(
-                    f"Process {current_process.pid} used its time quantum, remaining: {current_process.remaining_duration}")
+    for process in iter_stream_processes(stream):
+        # Run any transient events that are due
+        current_time = run_transient_events(current_time, events, stats, sink, metrics=metrics)
 
-                # Update current time before adding back to ready queue
-                current_time += time_slice
+        # Ensure process starts when it arrives, running the transient events that come first
+        while events.idle_wakeup and current_time < events.next_time <= process.arrival_time:
+            current_time = run_transient_events(events.next_time, events, stats, sink, metrics=metrics)
+        if current_time < process.arrival_time:
+            current_time = process.arrival_time
+        process.response_time = current_time - process.arrival_time
 
-                # Add back to ready queue
-                ready_queue.append(current_process)
-                continue  # Skip the time update at the end since we already updated it
+        if trace:
+            sink.emit("start", current_time, process.pid)
+        if metrics is not None:
+            metrics.record_decision(current_time, process.pid)
 
-            # Update the current time
-            current_time += time_slice
+        process.completion_time = run_with_interrupts(current_time, process.duration, process, events, stats, sink,
+                                                      metrics=metrics)
+        process.turnaround_time = calculate_turnaround_time(process)
+        process.waiting_time = calculate_waiting_time(process)
+        current_time = process.completion_time
 
-    print_algorithm_summary("Round Robin", completed_processes)
-    return completed_processes
\ No newline at end of file
+        if trace:
+            print_process_info(process, sink)
+        stats.append(process)
+
+    if metrics is not None:
+        metrics.end_phase("simulate")
+    print_stream_summary("FCFS", stats, sink)
+    sink.flush()
+    return stats
+
+
+# Round Robin over a stream of arrival-ordered ProcessTable chunks.
+# Only the processes in the ready queue are held in memory; completions are folded
+# into the returned CompletionStats as they happen.
+def stream_round_robin_scheduling(stream, time_quantum, sink=None, rng=None, progress=None, progress_every=100000,
+                                  transient_events=ONE_SHOT, metrics=None, quantiles=MetricSummary.QUANTILES):
+    sink = resolve_sink(sink)
+    rng = random if rng is None else rng
+
+    stats = CompletionStats(progress, progress_every, quantiles)
+    round_robin_kernel(iter_stream_processes(stream), time_quantum, sink, rng, stats, transient_events, metrics)
+    print_stream_summary("Round Robin", stats, sink)
+    sink.flush()
+    return stats
@@ -0,0 +1,230 @@
+# stats.py
+import math
+from bisect import insort
+from statistics import NormalDist
+
+
+# Running mean and variance (Welford's algorithm) in constant memory.
+# Partial results from different workers are combined with merge().
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean:.4f}, variance={self.variance:.4f})"
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    # Folds another RunningStats into this one (Chan et al. parallel update)
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    # Sample variance
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    # Normal-approximation confidence interval for the mean
+    def confidence_interval(self, confidence=0.95):
+        if self.count < 2:
+            return self.mean, self.mean
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half_width = z * self.stdev / math.sqrt(self.count)
+        return self.mean - half_width, self.mean + half_width
+
+
+# Quantile of a sorted sequence, interpolating linearly between the two closest ranks
+def exact_quantile(values, quantile):
+    if not values:
+        return 0.0
+    position = quantile * (len(values) - 1)
+    lower = int(position)
+    if lower + 1 >= len(values):
+        return values[-1]
+    return values[lower] + (values[lower + 1] - values[lower]) * (position - lower)
+
+
+# Streaming estimate of one quantile with the P-square algorithm (Jain and Chlamtac, 1985).
+# The first exact_limit values are kept sorted and the quantile is exact until then, since
+# the markers need many values to settle. After that five markers track the minimum, the
+# quantile, the maximum and two points in between, starting from the buffered values at
+# those ranks, so memory and the cost of each value are O(1).
+class P2Quantile:
+    EXACT_LIMIT = 500
+
+    def __init__(self, quantile, exact_limit=EXACT_LIMIT):
+        self.quantile = quantile
+        self.exact_limit = max(exact_limit, 5)
+        self.values = []  # Sorted values until there are more than exact_limit, then None
+        self.heights = None  # Marker heights
+        self.positions = None  # Marker positions; positions[4] is the count
+        self.fractions = (0, quantile / 2, quantile, (1 + quantile) / 2, 1)  # Where the markers should sit
+
+    def add(self, value):
+        values = self.values
+        if values is not None:
+            insort(values, value)
+            if len(values) > self.exact_limit:
+                self.start_markers()
+            return
+
+        # Shift the markers above the cell the value falls in, stretching the extremes if needed
+        heights = self.heights
+        positions = self.positions
+        if value < heights[2]:
+            if value < heights[0]:
+                heights[0] = value
+            if value < heights[1]:
+                positions[1] += 1
+            positions[2] += 1
+            positions[3] += 1
+        elif value < heights[3]:
+            positions[3] += 1
+        elif value > heights[4]:
+            heights[4] = value
+        positions[4] += 1
+
+        # Move the middle markers towards their desired positions
+        count = positions[4] - 1
+        fractions = self.fractions
+        for marker in (1, 2, 3):
+            offset = 1 + count * fractions[marker] - positions[marker]
+            if (offset >= 1 and positions[marker + 1] - positions[marker] > 1) or (
+                    offset <= -1 and positions[marker - 1] - positions[marker] < -1):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(marker, step)
+                if not heights[marker - 1] < height < heights[marker + 1]:
+                    height = heights[marker] + step * (heights[marker + step] - heights[marker]) / (
+                        positions[marker + step] - positions[marker])
+                heights[marker] = height
+                positions[marker] += step
+
+    # Places the markers on the buffered values at their desired ranks and drops the buffer
+    def start_markers(self):
+        values = self.values
+        ranks = [round(fraction * (len(values) - 1)) for fraction in self.fractions]
+        for marker in (1, 2, 3):  # Keep the ranks distinct
+            ranks[marker] = max(ranks[marker], ranks[marker - 1] + 1)
+        for marker in (3, 2, 1):
+            ranks[marker] = min(ranks[marker], ranks[marker + 1] - 1)
+        self.heights = [values[rank] for rank in ranks]
+        self.positions = [rank + 1 for rank in ranks]
+        self.values = None
+
+    # Piecewise-parabolic prediction of a marker's height after moving it one step
+    def parabolic(self, marker, step):
+        heights = self.heights
+        positions = self.positions
+        below = positions[marker] - positions[marker - 1]
+        above = positions[marker + 1] - positions[marker]
+        return heights[marker] + step / (below + above) * (
+            (below + step) * (heights[marker + 1] - heights[marker]) / above +
+            (above - step) * (heights[marker] - heights[marker - 1]) / below)
+
+    # Current estimate (exact while there are at most exact_limit values)
+    @property
+    def value(self):
+        if self.values is not None:
+            return exact_quantile(self.values, self.quantile)
+        return self.heights[2]
+
+
+# Streaming summary of one metric: count, mean and variance (RunningStats), maximum, and
+# P-square estimates of the given quantiles (exact for small counts), in bounded memory.
+class MetricSummary(RunningStats):
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, quantiles=QUANTILES):
+        super().__init__()
+        self.max = 0
+        self.sketches = [P2Quantile(quantile) for quantile in quantiles]
+
+    def add(self, value):
+        super().add(value)
+        if value > self.max or self.count == 1:
+            self.max = value
+        for sketch in self.sketches:
+            sketch.add(value)
+
+    # Quantile sketches cannot be combined, so only the moments of plain RunningStats merge
+    def merge(self, other):
+        raise TypeError("MetricSummary quantile sketches cannot be merged")
+
+    def percentile(self, quantile):
+        for sketch in self.sketches:
+            if sketch.quantile == quantile:
+                return sketch.value
+        raise KeyError(f"Quantile {quantile} is not tracked")
+
+    @property
+    def p50(self):
+        return self.percentile(0.5)
+
+    @property
+    def p95(self):
+        return self.percentile(0.95)
+
+    @property
+    def p99(self):
+        return self.percentile(0.99)
+
+    def summary(self):
+        summary = {"count": self.count, "mean": self.mean, "variance": self.variance, "max": self.max}
+        for sketch in self.sketches:
+            summary[f"p{sketch.quantile * 100:g}"] = sketch.value
+        return summary
+
+
+# Accumulates waiting, turnaround and response time statistics as processes complete,
+# without keeping them. It has the append() of a completed-process list, so schedulers can
+# fill it in place of one, and calls progress(self) every progress_every completions.
+class CompletionStats:
+    def __init__(self, progress=None, progress_every=100000, quantiles=MetricSummary.QUANTILES):
+        self.waiting_time = MetricSummary(quantiles)
+        self.turnaround_time = MetricSummary(quantiles)
+        self.response_time = MetricSummary(quantiles)
+        self.last_completion_time = 0
+        self.progress = progress
+        self.progress_every = progress_every
+
+    def __len__(self):
+        return self.waiting_time.count
+
+    # Builds the statistics of an already completed list of processes in one pass
+    @classmethod
+    def from_processes(cls, processes, quantiles=MetricSummary.QUANTILES):
+        stats = cls(quantiles=quantiles)
+        for process in processes:
+            stats.append(process)
+        return stats
+
+    def append(self, process):
+        self.waiting_time.add(process.waiting_time)
+        self.turnaround_time.add(process.turnaround_time)
+        self.response_time.add(process.response_time)
+        self.last_completion_time = max(self.last_completion_time, process.completion_time)
+        if self.progress is not None and self.waiting_time.count % self.progress_every == 0:
+            self.progress(self)
+
+    def summary(self):
+        return {
+            "waiting_time": self.waiting_time.summary(),
+            "turnaround_time": self.turnaround_time.summary(),
+            "response_time": self.response_time.summary(),
+        }
@@ -0,0 +1,179 @@
+# sweep.py
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache import cached_run, workload_digest
+from compare import DEFAULT_RUNS, run_algorithm, workload_columns
+from process import ProcessTable, copy_processes, generate_processes
+from scheduling import calculate_average_times, round_robin_kernel
+from stats import RunningStats
+from tracing import NULL_SINK
+
+
+# Builds the random.Random for one stream of a replication.
+# String seeds are hashed deterministically, so every (seed, point, replication, stream)
+# gets the same numbers on any worker and in any order.
+def replication_rng(seed, point, replication, stream):
+    return random.Random(f"{seed}:{point}:{replication}:{stream}")
+
+
+# Runs a block of seeded replications for one workload point.
+# Every replication draws one workload and schedules it with each run (common random
+# numbers), and only the per-run RunningStats of the replication averages are returned.
+# Runs go through run_algorithm, so a cache.ResultCache, if given, is checked first.
+def run_replications(seed, point, workload_params, runs, first, stop, cache=None):
+    partial = [(RunningStats(), RunningStats()) for _ in runs]
+    for replication in range(first, stop):
+        workload_rng = replication_rng(seed, point, replication, "workload")
+        workload = ProcessTable.from_processes(generate_processes(rng=workload_rng, **workload_params))
+        digest = workload_digest(workload) if cache is not None else None
+        for run_index, (name, params) in enumerate(runs):
+            # Seeded like replication_rng(seed, point, replication, run_index)
+            row = run_algorithm(workload, name, params, seed=f"{seed}:{point}:{replication}:{run_index}",
+                                cache=cache, digest=digest)
+            partial[run_index][0].add(row["avg_waiting_time"])
+            partial[run_index][1].add(row["avg_turnaround_time"])
+    return point, partial
+
+
+# Runs `replications` seeded replications of every run for each workload point and
+# returns one row per (point, run) with the mean, variance and confidence interval of
+# the average waiting and turnaround times.
+# workload_points is a list of generate_processes keyword arguments, e.g.
+# [{"num_processes": 13}, {"num_processes": 100, "max_arrival_time": 50}].
+# Blocks of `block_size` replications run in a process pool with a bounded number of
+# blocks in flight or waiting to be merged, so memory stays flat. Blocks are merged in
+# block order whatever order they finish in, because floating-point merges are not
+# associative; the results are then identical for any worker count.
+# A cache.ResultCache, if given, is checked before every run and stores the runs it misses.
+def monte_carlo_sweep(workload_points, runs=DEFAULT_RUNS, replications=1000, seed=0,
+                      max_workers=None, block_size=50, confidence=0.95, cache=None):
+    totals = [[(RunningStats(), RunningStats()) for _ in runs] for _ in workload_points]
+    blocks = ((seed, point, workload_params, runs, first, min(first + block_size, replications), cache)
+              for point, workload_params in enumerate(workload_points)
+              for first in range(0, replications, block_size))
+
+    def merge(result):
+        point, partial = result
+        for (waiting, turnaround), (block_waiting, block_turnaround) in zip(totals[point], partial):
+            waiting.merge(block_waiting)
+            turnaround.merge(block_turnaround)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        for block in blocks:
+            merge(run_replications(*block))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}  # Future -> block index
+            finished = {}  # Block index -> result, for blocks that finished ahead of their turn
+            next_block = 0  # Index of the next block to merge
+
+            def collect(done):
+                nonlocal next_block
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while next_block in finished:
+                    merge(finished.pop(next_block))
+                    next_block += 1
+
+            for index, block in enumerate(blocks):
+                while len(pending) + len(finished) >= 2 * max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[executor.submit(run_replications, *block)] = index
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+    rows = []
+    for workload_params, point_totals in zip(workload_points, totals):
+        for (name, params), (waiting, turnaround) in zip(runs, point_totals):
+            rows.append({
+                "workload": workload_params,
+                "algorithm": name,
+                "params": params,
+                "replications": waiting.count,
+                "avg_waiting_time": waiting.mean,
+                "waiting_time_variance": waiting.variance,
+                "waiting_time_ci": waiting.confidence_interval(confidence),
+                "avg_turnaround_time": turnaround.mean,
+                "turnaround_time_variance": turnaround.variance,
+                "turnaround_time_ci": turnaround.confidence_interval(confidence),
+            })
+    return rows
+
+
+# Prints sweep rows as a table with confidence intervals
+def print_sweep(rows):
+    print("{:<40} {:<15} {:<28} {:<28}".format("Workload", "Algorithm", "Avg Waiting Time (CI)",
+                                               "Avg Turnaround Time (CI)"))
+    print("-" * 111)
+    for row in rows:
+        workload = ", ".join(f"{key}={value}" for key, value in row["workload"].items())
+        waiting = "{:.2f} ({:.2f}-{:.2f})".format(row["avg_waiting_time"], *row["waiting_time_ci"])
+        turnaround = "{:.2f} ({:.2f}-{:.2f})".format(row["avg_turnaround_time"], *row["turnaround_time_ci"])
+        print("{:<40} {:<15} {:<28} {:<28}".format(workload, row["algorithm"], waiting, turnaround))
+
+
+# Arrival-sorted workload installed in each worker process by _init_quantum_worker
+_worker_sorted_workload = None
+
+
+def _init_quantum_worker(columns):
+    global _worker_sorted_workload
+    _worker_sorted_workload = ProcessTable(*columns)
+
+
+# Runs Round Robin with one quantum over an arrival-sorted table and reduces it to a row.
+# Every quantum uses the same transient-event seed, so the curve is not noise from the event.
+# A cache.ResultCache, if given, is checked first; digest is the table's workload_digest.
+def run_quantum(sorted_workload, time_quantum, seed, cache=None, digest=None):
+    def run():
+        processes = copy_processes(sorted_workload)
+        results, context_switches = round_robin_kernel(processes, time_quantum, NULL_SINK, random.Random(seed))
+        return results, None, {"context_switches": context_switches}
+
+    results, _, extra = cached_run(cache, sorted_workload, "Round Robin kernel", {"time_quantum": time_quantum},
+                                   seed, run, digest=digest)
+    context_switches = extra["context_switches"]
+    avg_waiting_time, avg_turnaround_time = calculate_average_times(results)
+    return {
+        "time_quantum": time_quantum,
+        "avg_waiting_time": avg_waiting_time,
+        "avg_turnaround_time": avg_turnaround_time,
+        "context_switches": context_switches,
+    }
+
+
+def _run_quantum_in_worker(time_quantum, seed, cache, digest):
+    return run_quantum(_worker_sorted_workload, time_quantum, seed, cache, digest)
+
+
+# Runs Round Robin once per time quantum and returns the waiting time, turnaround time and
+# context switch curve, one row per quantum in the order given.
+# The workload is sorted by arrival once and sent to each worker once; every quantum then
+# builds its Process objects straight from the sorted columns, without re-sorting.
+# A cache.ResultCache, if given, is checked before every quantum and stores the ones it misses.
+def round_robin_quantum_sweep(workload, quanta=range(1, 51), seed=0, max_workers=None, cache=None):
+    if not isinstance(workload, ProcessTable):
+        workload = ProcessTable.from_processes(workload)
+    sorted_workload = workload.sorted_by_arrival()
+    digest = workload_digest(sorted_workload) if cache is not None else None
+    quanta = list(quanta)
+
+    max_workers = max_workers or min(len(quanta), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [run_quantum(sorted_workload, time_quantum, seed, cache, digest) for time_quantum in quanta]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_quantum_worker,
+                             initargs=(workload_columns(sorted_workload),)) as executor:
+        futures = [executor.submit(_run_quantum_in_worker, time_quantum, seed, cache, digest)
+                   for time_quantum in quanta]
+        return [future.result() for future in futures]
+
+
+# Returns the sweep row with the lowest value of the given metric
+def best_quantum(rows, metric="avg_waiting_time"):
+    return min(rows, key=lambda row: row[metric])
@@ -0,0 +1,67 @@
+# test_batch_runner.py
+import os
+import random
+import tempfile
+import unittest
+
+from batch_runner import load_batch_results, run_batch
+from cache import ResultCache
+from process import generate_processes, save_processes_to_binary, save_processes_to_file
+
+RUNS = [("FCFS", {}), ("SRTF", {}), ("Round Robin", {"time_quantum": 2})]
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.workloads = os.path.join(self.directory.name, "workloads")
+        os.makedirs(os.path.join(self.workloads, "nested"))
+        save_processes_to_file(generate_processes(20, random.Random(1)), os.path.join(self.workloads, "a.csv"))
+        save_processes_to_binary(generate_processes(30, random.Random(2)), os.path.join(self.workloads, "b.cpuw"))
+        save_processes_to_file(generate_processes(10, random.Random(3)),
+                               os.path.join(self.workloads, "nested", "c.csv"))
+        self.output = os.path.join(self.directory.name, "results.cpub")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, data):
+        with open(os.path.join(self.workloads, name), mode='wb') as file:
+            file.write(data)
+
+    def test_bad_files_are_reported_and_skipped(self):
+        self.write("empty.csv", b"")
+        self.write("empty.cpuw", b"")
+        self.write("header.csv", b"PID,Arrival Time,Duration,Priority\n")
+        self.write("text.csv", b"PID,Arrival Time,Duration,Priority\n1,x,3,1\n")
+        self.write("truncated.cpuw", b"CPUW\x01\x00\x00\x00\x05\x00\x00\x00\x00\x00\x00\x00")
+        results = run_batch(self.workloads, RUNS, self.output, max_workers=2)
+        self.assertEqual(sorted(results.errors), ["empty.cpuw", "empty.csv", "header.csv", "text.csv",
+                                                  "truncated.cpuw"])
+        self.assertEqual(len(results), 2 * len(RUNS))
+
+    def test_results_file_round_trip(self):
+        results = run_batch(self.workloads, RUNS, self.output, max_workers=1, recursive=True)
+        loaded = load_batch_results(self.output)
+        self.assertEqual(len(loaded["file"]), 3 * len(RUNS))
+        self.assertEqual(sorted(set(loaded["file"])), ["a.csv", "b.cpuw", os.path.join("nested", "c.csv")])
+        self.assertEqual(list(loaded["avg_waiting_time"]), list(results.columns["avg_waiting_time"]))
+        self.assertEqual(loaded["errors"], {})
+
+    def test_results_do_not_depend_on_workers_or_cache(self):
+        def metrics(results):
+            return {name: list(column) for name, column in results.columns.items() if name != "wall_time"}
+
+        serial = run_batch(self.workloads, RUNS, self.output, max_workers=1, seed=4)
+        parallel = run_batch(self.workloads, RUNS, self.output, max_workers=3, seed=4)
+        cache = ResultCache(os.path.join(self.directory.name, "cache"))
+        stored = run_batch(self.workloads, RUNS, self.output, max_workers=2, seed=4, cache=cache)
+        cached = run_batch(self.workloads, RUNS, self.output, max_workers=1, seed=4, cache=cache)
+        self.assertEqual(metrics(parallel), metrics(serial))
+        self.assertEqual(metrics(stored), metrics(serial))
+        self.assertEqual(metrics(cached), metrics(serial))
+        self.assertEqual(len(cache), 2 * len(RUNS))
+
+
+if __name__ == "__main__":
+    unittest.main()
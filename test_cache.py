@@ -0,0 +1,94 @@
+# test_cache.py
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from cache import ResultCache, result_columns, result_key, workload_digest
+from compare import compare_algorithms, run_algorithm
+from process import ProcessTable, generate_processes
+from sweep import round_robin_quantum_sweep
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+        self.workload = ProcessTable.from_processes(generate_processes(30, random.Random(7)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        processes = generate_processes(10, random.Random(1))
+        columns = result_columns(processes)
+        self.cache.put("key", columns, "trace\n", {"context_switches": 4})
+        self.assertEqual(self.cache.get("key"), (columns, "trace\n", {"context_switches": 4}))
+        self.assertIsNone(self.cache.get("missing"))
+        # A new instance finds the entry on disk
+        self.assertEqual(ResultCache(self.directory.name).get("key")[0], columns)
+
+    def test_hit_matches_fresh_run(self):
+        for name, params in (("SRTF", {}), ("Round Robin", {"time_quantum": 2}), ("MLFQ", {})):
+            with self.subTest(algorithm=name):
+                fresh = run_algorithm(self.workload, name, params, capture_trace=True, seed=3)
+                stored = run_algorithm(self.workload, name, params, capture_trace=True, seed=3, cache=self.cache)
+                hit = run_algorithm(self.workload, name, params, capture_trace=True, seed=3, cache=self.cache)
+                self.assertEqual(stored, fresh)
+                self.assertEqual(hit, fresh)
+                self.assertIn(result_key(workload_digest(self.workload), name, params, 3), self.cache)
+
+    def test_unseeded_runs_are_not_cached(self):
+        run_algorithm(self.workload, "FCFS", {}, cache=self.cache)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_comparison_uses_cache(self):
+        fresh = compare_algorithms(self.workload, max_workers=1, seed=5)
+        self.assertEqual(compare_algorithms(self.workload, max_workers=2, seed=5, cache=self.cache), fresh)
+        self.assertEqual(len(ResultCache(self.directory.name)), len(fresh))  # Stored by the workers
+        self.assertEqual(compare_algorithms(self.workload, max_workers=2, seed=5, cache=self.cache), fresh)
+
+    def test_quantum_sweep_uses_cache(self):
+        fresh = round_robin_quantum_sweep(self.workload, quanta=range(1, 5), max_workers=1)
+        self.assertEqual(round_robin_quantum_sweep(self.workload, quanta=range(1, 5), max_workers=2,
+                                                   cache=self.cache), fresh)
+        self.assertEqual(len(ResultCache(self.directory.name)), 4)  # Stored by the workers
+        self.assertEqual(round_robin_quantum_sweep(self.workload, quanta=range(1, 5), max_workers=1,
+                                                   cache=self.cache), fresh)
+
+    def test_finds_entries_written_by_another_process(self):
+        columns = result_columns(generate_processes(5, random.Random(4)))
+        ResultCache(self.directory.name).put("key", columns)
+        self.assertEqual(self.cache.get("key")[0], columns)
+        self.assertIn("key", self.cache)
+
+    def test_evicts_least_recently_used(self):
+        columns = result_columns(generate_processes(50, random.Random(2)))
+        self.cache.put("a", columns)
+        entry_size = self.cache.total_bytes
+        cache = ResultCache(self.directory.name, max_bytes=3 * entry_size)
+        cache.put("b", columns)
+        cache.put("c", columns)
+        cache.get("a")  # a is now the most recently used
+        cache.put("d", columns)
+        self.assertNotIn("b", cache)
+        self.assertEqual(sorted(cache.entries), ["a", "c", "d"])
+        self.assertEqual(cache.total_bytes, 3 * entry_size)
+        self.assertFalse(os.path.exists(cache.path("b")))
+
+    def test_damaged_entry_is_a_miss(self):
+        self.cache.put("key", result_columns(generate_processes(5, random.Random(3))))
+        with open(self.cache.path("key"), mode='r+b') as file:
+            file.write(b"XXXX")
+        self.assertIsNone(self.cache.get("key"))
+        self.assertNotIn("key", self.cache)
+
+    def test_pickles_as_its_directory(self):
+        cache = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual((cache.directory, cache.max_bytes), (self.cache.directory, self.cache.max_bytes))
+        self.assertIs(pickle.loads(pickle.dumps(self.cache)), cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
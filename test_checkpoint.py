@@ -0,0 +1,107 @@
+# test_checkpoint.py
+import os
+import random
+import tempfile
+import unittest
+
+from checkpoint import Checkpoint
+from instrumentation import SchedulerMetrics
+from process import ProcessTable, generate_processes
+from scheduling import round_robin_scheduling, srtf_scheduling
+from tracing import NULL_SINK
+from transient import PoissonTransientEvents
+
+
+class Killed(Exception):
+    pass
+
+
+# Checkpoint that saves every `every` dispatch points and kills the run after `kill_after` saves
+class KillingCheckpoint(Checkpoint):
+    def __init__(self, path, every, kill_after):
+        super().__init__(path, interval=0)
+        self.every = every
+        self.kill_after = kill_after
+        self.calls = 0
+
+    def due(self):
+        self.calls += 1
+        return self.calls % self.every == 0
+
+    def save(self, state):
+        super().save(state)
+        if self.saves >= self.kill_after:
+            raise Killed()
+
+
+# Per-PID outcome of a run, in completion order
+def outcomes(processes):
+    return [(process.pid, process.completion_time, process.waiting_time, process.turnaround_time,
+             process.response_time) for process in processes]
+
+
+def metric_counts(metrics):
+    return metrics.decisions, metrics.preemptions, metrics.context_switches, dict(metrics.queue_time)
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume_after_kill_matches_uninterrupted_run(self):
+        runs = ((srtf_scheduling, {}), (round_robin_scheduling, {"time_quantum": 3}))
+        models = (None, PoissonTransientEvents(0.1, preemptive=True), PoissonTransientEvents(0.1, max_events=30))
+        kills = 0
+        for seed in range(20):
+            rng = random.Random(seed)
+            processes = generate_processes(rng.randint(5, 60), rng, max_arrival_time=rng.choice((5, 100)),
+                                           max_duration=rng.choice((5, 30)))
+            if seed % 2:
+                processes = ProcessTable.from_processes(processes)
+            for scheduler, params in runs:
+                for model in models:
+                    if model is not None:
+                        params = dict(params, transient_events=model)  # Replaces the previous model
+                    with self.subTest(scheduler=scheduler.__name__, seed=seed, model=model):
+                        expected_metrics = SchedulerMetrics(timing=False)
+                        expected = scheduler(processes, sink=NULL_SINK, rng=random.Random(seed),
+                                             metrics=expected_metrics, **params)
+
+                        checkpoint = KillingCheckpoint(self.path, rng.randint(1, 10), rng.randint(1, 3))
+                        try:
+                            scheduler(processes, sink=NULL_SINK, rng=random.Random(seed),
+                                      metrics=SchedulerMetrics(timing=False), checkpoint=checkpoint, **params)
+                            continue  # Finished before the kill
+                        except Killed:
+                            kills += 1
+
+                        # A different rng: the saved state has to restore the random stream too
+                        checkpoint = Checkpoint(self.path)
+                        metrics = SchedulerMetrics(timing=False)
+                        resumed = scheduler(processes, sink=NULL_SINK, rng=random.Random(-1), metrics=metrics,
+                                            checkpoint=checkpoint, **params)
+                        self.assertTrue(checkpoint.resumed)
+                        self.assertFalse(os.path.exists(self.path))
+                        self.assertEqual(outcomes(resumed), outcomes(expected))
+                        self.assertEqual(metric_counts(metrics), metric_counts(expected_metrics))
+        self.assertGreater(kills, 50)
+
+    def test_checkpoint_of_another_workload_is_rejected(self):
+        srtf_scheduling(generate_processes(20, random.Random(1)), sink=NULL_SINK, rng=random.Random(1),
+                        checkpoint=Checkpoint(self.path, interval=0, keep=True))
+        with self.assertRaises(ValueError):
+            srtf_scheduling(generate_processes(20, random.Random(2)), sink=NULL_SINK,
+                            checkpoint=Checkpoint(self.path))
+
+    def test_checkpoints_need_a_single_cpu(self):
+        with self.assertRaises(ValueError):
+            round_robin_scheduling(generate_processes(5), 2, sink=NULL_SINK, num_cpus=2,
+                                   checkpoint=Checkpoint(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
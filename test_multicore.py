@@ -0,0 +1,91 @@
+# test_multicore.py
+import random
+import unittest
+
+from multicore import MulticoreReport, POLICIES, simulate_multicore
+from process import generate_process_table
+from scheduling import (fcfs_scheduling, priority_scheduling, round_robin_scheduling, sjf_scheduling,
+                        srtf_scheduling)
+from tracing import NULL_SINK
+from transient import PoissonTransientEvents
+
+# Transient-event model that never fires
+NO_TRANSIENTS = PoissonTransientEvents(1, max_events=0)
+
+# Single-CPU scheduler for each policy
+SCHEDULERS = {
+    "fcfs": fcfs_scheduling,
+    "sjf": sjf_scheduling,
+    "priority": priority_scheduling,
+    "srtf": srtf_scheduling,
+    "rr": lambda processes, **kwargs: round_robin_scheduling(processes, 3, **kwargs),
+}
+
+# (dispatch, balance) combinations
+DISPATCH_MODES = (("global", None), ("per_core", None), ("per_core", "least_loaded"), ("per_core", "steal"))
+
+
+def outcomes(processes):
+    return sorted((process.pid, process.completion_time, process.waiting_time) for process in processes)
+
+
+class MulticoreTest(unittest.TestCase):
+    def test_invariants(self):
+        for seed in range(60):
+            rng = random.Random(seed)
+            workload = generate_process_table(rng.randint(1, 60), rng, max_arrival_time=rng.randint(0, 200))
+            for policy in POLICIES:
+                for dispatch, balance in DISPATCH_MODES:
+                    num_cpus = rng.randint(2, 6)
+                    with self.subTest(seed=seed, policy=policy, dispatch=dispatch, balance=balance):
+                        completed, report = simulate_multicore(workload, policy, num_cpus, time_quantum=3,
+                                                               dispatch=dispatch, balance=balance,
+                                                               sink=NULL_SINK, rng=random.Random(seed))
+                        self.assertEqual(sorted(process.pid for process in completed if process.pid != 999),
+                                         sorted(workload.pid))
+                        # Every core's busy time adds up to the total work, transient events included
+                        self.assertEqual(sum(report.busy_time), sum(process.duration for process in completed))
+                        self.assertEqual(report.makespan, max(process.completion_time for process in completed))
+                        self.assertTrue(all(0 <= utilization <= 1 for utilization in report.utilization))
+                        for process in completed:
+                            self.assertGreaterEqual(process.waiting_time, 0)
+                            self.assertGreaterEqual(process.response_time, 0)
+                            self.assertEqual(process.turnaround_time, process.waiting_time + process.duration)
+
+    def test_one_core_matches_single_cpu_schedulers(self):
+        for seed in range(60):
+            rng = random.Random(seed)
+            workload = generate_process_table(rng.randint(1, 60), rng, max_arrival_time=rng.randint(0, 200))
+            for policy, scheduler in SCHEDULERS.items():
+                with self.subTest(seed=seed, policy=policy):
+                    completed, _ = simulate_multicore(workload, policy, 1, time_quantum=3, sink=NULL_SINK,
+                                                      transient_events=NO_TRANSIENTS)
+                    expected = scheduler(workload, sink=NULL_SINK, transient_events=NO_TRANSIENTS)
+                    self.assertEqual(outcomes(completed), outcomes(expected))
+
+    def test_schedulers_fill_report(self):
+        workload = generate_process_table(40, random.Random(1), max_arrival_time=30)
+        total_duration = sum(workload.duration)
+        for num_cpus in (1, 4):
+            for policy, scheduler in SCHEDULERS.items():
+                with self.subTest(num_cpus=num_cpus, policy=policy):
+                    report = MulticoreReport()
+                    completed = scheduler(workload, sink=NULL_SINK, num_cpus=num_cpus, report=report,
+                                          transient_events=NO_TRANSIENTS)
+                    self.assertEqual(report.num_cpus, num_cpus)
+                    self.assertEqual(sum(report.busy_time), total_duration)
+                    self.assertEqual(report.makespan, max(process.completion_time for process in completed))
+
+    def test_rejects_bad_arguments(self):
+        workload = generate_process_table(5, random.Random(1))
+        for num_cpus in (0, -1):
+            with self.assertRaises(ValueError):
+                fcfs_scheduling(workload, sink=NULL_SINK, num_cpus=num_cpus)
+        with self.assertRaises(ValueError):
+            simulate_multicore(workload, "rr", 2)
+        with self.assertRaises(ValueError):
+            simulate_multicore(workload, "fcfs", 2, balance="steal")
+
+
+if __name__ == "__main__":
+    unittest.main()
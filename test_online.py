@@ -0,0 +1,87 @@
+# test_online.py
+import asyncio
+import io
+import random
+import unittest
+from contextlib import redirect_stderr
+
+from online import OnlineScheduler, OnlineService
+from process import Process, copy_processes, generate_processes
+from scheduling import fcfs_scheduling, priority_scheduling, round_robin_scheduling, sjf_scheduling, srtf_scheduling
+from tracing import NULL_SINK
+from transient import PoissonTransientEvents
+
+# Transient-event model that never fires, so the batch schedulers run only the workload
+NO_TRANSIENTS = PoissonTransientEvents(1, max_events=0)
+
+# Batch scheduler for each online policy
+BATCH_SCHEDULERS = {
+    "fcfs": fcfs_scheduling,
+    "sjf": sjf_scheduling,
+    "priority": priority_scheduling,
+    "srtf": srtf_scheduling,
+    "rr": lambda processes, **kwargs: round_robin_scheduling(processes, 2, **kwargs),
+}
+
+
+# Per-PID (completion, waiting, turnaround, response) times
+def outcomes(processes):
+    return {process.pid: (process.completion_time, process.waiting_time, process.turnaround_time,
+                          process.response_time) for process in processes}
+
+
+# Submits the processes to an online scheduler in arrival order and runs it to completion
+def run_online(policy, processes):
+    scheduler = OnlineScheduler(policy, time_quantum=2)
+    submitted = sorted(copy_processes(processes), key=lambda process: process.arrival_time)
+    for process in submitted:
+        scheduler.submit(process)
+    scheduler.drain()
+    return submitted
+
+
+def run_batch(policy, processes):
+    return BATCH_SCHEDULERS[policy](processes, sink=NULL_SINK, rng=random.Random(0),
+                                    transient_events=NO_TRANSIENTS)
+
+
+class OnlineSchedulerTest(unittest.TestCase):
+    def assert_matches_batch(self, policy, processes):
+        self.assertEqual(outcomes(run_online(policy, processes)), outcomes(run_batch(policy, processes)))
+
+    def test_sjf_picks_arrival_at_completion_instant(self):
+        processes = [Process(6, 4, 2), Process(2, 8, 9), Process(4, 11, 10), Process(3, 12, 5),
+                     Process(5, 16, 3), Process(1, 24, 7), Process(7, 25, 5)]
+        completed = run_online("sjf", processes)
+        self.assert_matches_batch("sjf", processes)
+        # P5 finishes at 25 just as P7 arrives; P7 is shorter than P1 and runs next
+        self.assertEqual(outcomes(completed)[7][3], 0)
+
+    def test_round_robin_requeues_expired_process_first(self):
+        processes = [Process(1, 0, 5), Process(2, 1, 3)]
+        completed = outcomes(run_online("rr", processes))
+        # P2 arrives during P1's first quantum, so it queues behind P1 and starts at 4
+        self.assertEqual(completed[2][3], 3)
+        self.assert_matches_batch("rr", processes)
+
+    def test_matches_batch_schedulers(self):
+        rng = random.Random(13)
+        for _ in range(200):
+            processes = generate_processes(rng.randint(1, 30), rng, max_arrival_time=rng.choice((0, 10, 60)))
+            for policy in BATCH_SCHEDULERS:
+                with self.subTest(policy=policy, processes=processes):
+                    self.assert_matches_batch(policy, processes)
+
+    def test_error_reply_without_writer_goes_to_stderr(self):
+        service = OnlineService(OnlineScheduler("fcfs"))
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"1,0,5\n")
+        reader.feed_eof()
+        errors = io.StringIO()
+        with redirect_stderr(errors):
+            asyncio.run(service.read_lines(reader))
+        self.assertIn("error: Expected pid,arrival_time,duration,priority", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# test_stats.py
+import random
+import unittest
+
+from stats import MetricSummary, P2Quantile, exact_quantile
+
+
+class QuantileTest(unittest.TestCase):
+    def test_exact_quantile_interpolates(self):
+        values = list(range(1, 8))
+        self.assertEqual(exact_quantile(values, 0.5), 4)
+        self.assertAlmostEqual(exact_quantile(values, 0.99), 6.94)
+        self.assertEqual(exact_quantile(values, 1), 7)
+        self.assertEqual(exact_quantile([], 0.5), 0.0)
+
+    def test_small_counts_are_exact(self):
+        rng = random.Random(3)
+        values = [rng.randint(0, 60) for _ in range(P2Quantile.EXACT_LIMIT)]
+        summary = MetricSummary()
+        for value in values:
+            summary.add(value)
+        values.sort()
+        for quantile in MetricSummary.QUANTILES:
+            self.assertEqual(summary.percentile(quantile), exact_quantile(values, quantile))
+
+    def test_sketch_tracks_large_counts(self):
+        rng = random.Random(5)
+        values = [rng.expovariate(1) for _ in range(50000)]
+        summary = MetricSummary()
+        for value in values:
+            summary.add(value)
+        values.sort()
+        for quantile in MetricSummary.QUANTILES:
+            exact = exact_quantile(values, quantile)
+            self.assertAlmostEqual(summary.percentile(quantile), exact, delta=0.05 * exact)
+
+
+if __name__ == "__main__":
+    unittest.main()
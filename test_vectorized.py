@@ -0,0 +1,58 @@
+# test_vectorized.py
+import random
+import unittest
+
+from process import Process, ProcessTable, generate_processes
+from scheduling import fcfs_scheduling, priority_scheduling, sjf_scheduling
+from tracing import NULL_SINK
+from transient import PoissonTransientEvents
+
+try:
+    import vectorized
+except ImportError:  # numpy is optional
+    vectorized = None
+
+# Transient-event model that never fires, as the batch functions do not model one
+NO_TRANSIENTS = PoissonTransientEvents(1, max_events=0)
+
+
+@unittest.skipIf(vectorized is None, "numpy is not installed")
+class BatchTest(unittest.TestCase):
+    def assert_matches(self, processes, batch, reference):
+        arrival, duration, priority = vectorized.process_columns(processes)
+        if batch is vectorized.priority_batch:
+            metrics = batch(arrival, duration, priority)
+        else:
+            metrics = batch(arrival, duration)
+        expected = {process.pid: process for process in
+                    reference(processes, sink=NULL_SINK, transient_events=NO_TRANSIENTS)}
+        for process, completion_time, waiting_time in zip(processes, metrics.completion_time,
+                                                          metrics.waiting_time):
+            self.assertEqual(completion_time, expected[process.pid].completion_time)
+            self.assertEqual(waiting_time, expected[process.pid].waiting_time)
+        self.assertAlmostEqual(metrics.avg_waiting_time,
+                               sum(process.waiting_time for process in expected.values()) / len(expected))
+
+    def test_matches_reference_schedulers(self):
+        runs = ((vectorized.fcfs_batch, fcfs_scheduling), (vectorized.sjf_batch, sjf_scheduling),
+                (vectorized.priority_batch, priority_scheduling))
+        for seed in range(200):
+            rng = random.Random(seed)
+            processes = generate_processes(rng.randint(1, 80), rng, max_arrival_time=rng.choice((0, 10, 300)))
+            for batch, reference in runs:
+                with self.subTest(seed=seed, batch=batch.__name__):
+                    self.assert_matches(processes, batch, reference)
+
+    def test_table_columns(self):
+        processes = generate_processes(50, random.Random(1))
+        table = ProcessTable.from_processes(processes)
+        for expected, column in zip(vectorized.process_columns(processes), vectorized.process_columns(table)):
+            self.assertEqual(list(expected), list(column))
+
+    def test_missing_priority_is_zero(self):
+        processes = [Process(1, 0, 3), Process(2, 1, 2, 4)]
+        self.assertEqual(list(vectorized.process_columns(processes)[2]), [0, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
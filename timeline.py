@@ -0,0 +1,163 @@
+# timeline.py
+import csv
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from tracing import TraceSink
+
+# One stretch of time a process ran on a CPU, from start up to (not including) end
+Segment = namedtuple("Segment", ["cpu", "pid", "start", "end"])
+
+# Trace events that put a process on a CPU, and the ones that take it off again
+START_EVENTS = frozenset({"start", "resume", "slice", "transient_start", "cpu_start"})
+STOP_EVENTS = frozenset({"preempt", "quantum_expired", "quanta_expired", "complete", "cpu_preempt",
+                         "cpu_quantum_expired"})
+
+
+# Run-length-encoded record of what ran when.
+# Each CPU keeps its segments in three int64 arrays (pid, start, end), in time order, and a
+# segment that continues the CPU's last one (same process, no gap) extends it instead of
+# being stored again, so a process that runs many quanta in a row costs one segment.
+# Because a CPU's segments never overlap, point and window queries are binary searches.
+class Timeline:
+    def __init__(self):
+        self.columns = {}  # CPU -> (pid, start, end) arrays
+
+    def __len__(self):
+        return sum(len(pids) for pids, _, _ in self.columns.values())
+
+    def __repr__(self):
+        return f"Timeline(cpus={self.cpus}, segments={len(self)}, makespan={self.makespan})"
+
+    @property
+    def cpus(self):
+        return sorted(self.columns)
+
+    # End of the last segment on any CPU
+    @property
+    def makespan(self):
+        return max((ends[-1] for _, _, ends in self.columns.values() if ends), default=0)
+
+    # Records that pid ran on cpu from start to end
+    def append(self, cpu, pid, start, end):
+        if end <= start:
+            return
+        columns = self.columns.get(cpu)
+        if columns is None:
+            columns = self.columns[cpu] = (array('q'), array('q'), array('q'))
+        pids, starts, ends = columns
+        if ends and start < ends[-1]:
+            raise ValueError(f"Segment starting at {start} overlaps CPU {cpu}'s segment ending at {ends[-1]}")
+        if pids and pids[-1] == pid and ends[-1] == start:
+            ends[-1] = end  # Continues the last segment
+        else:
+            pids.append(pid)
+            starts.append(start)
+            ends.append(end)
+
+    # Lazily yields one CPU's segments that overlap [start, end), in time order
+    def cpu_segments(self, cpu, start=None, end=None, clip=False):
+        pids, starts, ends = self.columns.get(cpu, ((), (), ()))
+        first = 0 if start is None else bisect_right(ends, start)
+        stop = len(starts) if end is None else bisect_left(starts, end)
+        for i in range(first, stop):
+            segment_start, segment_end = starts[i], ends[i]
+            if clip:
+                if start is not None and segment_start < start:
+                    segment_start = start
+                if end is not None and segment_end > end:
+                    segment_end = end
+            yield Segment(cpu, pids[i], segment_start, segment_end)
+
+    # Lazily yields the segments that overlap [start, end) on every CPU (or just one),
+    # ordered by start time and then CPU. With clip, segments are cut to the window.
+    def window(self, start=None, end=None, cpu=None, clip=False):
+        if cpu is not None:
+            return self.cpu_segments(cpu, start, end, clip)
+        return heapq.merge(*(self.cpu_segments(core, start, end, clip) for core in self.cpus),
+                           key=lambda segment: (segment.start, segment.cpu))
+
+    def __iter__(self):
+        return self.window()
+
+    # PID running on a CPU at a time, or None if the CPU was idle
+    def at(self, time, cpu=0):
+        pids, starts, ends = self.columns.get(cpu, ((), (), ()))
+        i = bisect_right(starts, time) - 1
+        if i >= 0 and time < ends[i]:
+            return pids[i]
+        return None
+
+    # Time each CPU (or one CPU) spent running processes, within [start, end) if given
+    def busy_time(self, cpu=None, start=None, end=None):
+        return sum(segment.end - segment.start for segment in self.window(start, end, cpu, clip=True))
+
+    # Saves the segments as csv rows of CPU, PID, start and end
+    def save_csv(self, filename="timeline.csv"):
+        with open(filename, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["CPU", "PID", "Start", "End"])
+            writer.writerows(self.window())
+
+    # Renders [start, end) (the whole timeline by default) as a text Gantt chart: one row of
+    # process blocks per CPU, with the times the blocks change below it
+    def gantt_chart(self, start=None, end=None):
+        lines = []
+        for cpu in self.cpus:
+            bar = "CPU {} |".format(cpu)
+            times = " " * (len(bar) - 1)
+            time = None
+            for segment in self.cpu_segments(cpu, start, end, clip=True):
+                if time is None or segment.start > time:
+                    if time is not None:
+                        # The CPU was idle in between
+                        label = " idle "
+                        times += str(time).ljust(len(label) + 1)
+                        bar += label + "|"
+                    time = segment.start
+                label = f" P{segment.pid} "
+                times += str(time).ljust(len(label) + 1)
+                bar += label + "|"
+                time = segment.end
+            if time is None:
+                continue
+            lines.append(bar)
+            lines.append(times + str(time))
+        return "\n".join(lines)
+
+
+# Trace sink that records the schedule into a Timeline.
+# Segments are rebuilt from the dispatch and stop events every scheduler emits (events
+# without a cpu field are on CPU 0). Pass sink to forward every event to another sink as
+# well, e.g. to keep the console trace while recording.
+class TimelineTraceSink(TraceSink):
+    def __init__(self, timeline=None, sink=None):
+        self.timeline = Timeline() if timeline is None else timeline
+        self.sink = sink
+        self.running = {}  # CPU -> (pid, start) of its open segment
+
+    def emit(self, kind, time, pid=None, **fields):
+        if kind in START_EVENTS:
+            cpu = fields.get("cpu", 0)
+            if cpu in self.running:
+                running_pid, start = self.running[cpu]
+                self.timeline.append(cpu, running_pid, start, time)
+            self.running[cpu] = (pid, time)
+        elif kind in STOP_EVENTS:
+            cpu = fields.get("cpu", 0)
+            running = self.running.get(cpu)
+            if running is not None and running[0] == pid:
+                del self.running[cpu]
+                self.timeline.append(cpu, pid, running[1], time)
+        if self.sink is not None and self.sink.enabled:
+            self.sink.emit(kind, time, pid, **fields)
+
+    def flush(self):
+        if self.sink is not None:
+            self.sink.flush()
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
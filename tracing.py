@@ -0,0 +1,135 @@
+# tracing.py
+import json
+import sys
+
+
+# Base class for scheduler trace sinks.
+# Schedulers call emit(kind, time, pid, **fields) for every dispatch, preemption and
+# completion, but only after checking `enabled`, so a disabled sink costs nothing.
+class TraceSink:
+    enabled = True
+
+    def emit(self, kind, time, pid=None, **fields):
+        raise NotImplementedError
+
+    # Writes out any buffered events
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+# Sink that drops every event; use it to turn tracing off for bulk runs
+class NullTraceSink(TraceSink):
+    enabled = False
+
+    def emit(self, kind, time, pid=None, **fields):
+        pass
+
+
+NULL_SINK = NullTraceSink()
+
+
+# Sink that only counts events, e.g. to measure events per second
+class CountingTraceSink(TraceSink):
+    def __init__(self):
+        self.count = 0
+
+    def emit(self, kind, time, pid=None, **fields):
+        self.count += 1
+
+
+# Sink that renders events as the familiar console text.
+# Lines are buffered and written in batches; the stream defaults to whatever
+# sys.stdout is at flush time.
+class TextTraceSink(TraceSink):
+    TEMPLATES = {
+        "header": "\n--- {title} ---",
+        "transient_arrival": "New transient event (process {pid}) arrived at time {time}!\n"
+                             "Process Details: Duration={duration}, Priority={priority}",
+        "transient_start": "Starting Transient Process {pid}{detail} at time {time}",
+        "start": "Starting Process {pid}{detail} at time {time}",
+        "resume": "Starting/Resuming Process {pid}{detail} at time {time}",
+        "slice": "Starting/Resuming Process {pid} at time {time} (Remaining: {remaining})",
+        "preempt": "Process {pid} preempted at time {time}, remaining: {remaining}",
+        "quantum_expired": "Process {pid} used its time quantum, remaining: {remaining}",
+        "quanta_expired": "Process {pid} used {quanta} time quanta, remaining: {remaining}",
+        "aged": "Process {pid} aged to priority {key} at time {time}",
+        "boost": "Priority boost at time {time}: {moved} processes moved to the top queue",
+        "complete": "Process {pid} completed at time {time}, "
+                    "Waiting Time: {waiting_time}, Turnaround Time: {turnaround_time}",
+        "cpu_start": "CPU {cpu}: Starting/Resuming Process {pid} at time {time} (Remaining: {remaining})",
+        "cpu_preempt": "CPU {cpu}: Process {pid} preempted at time {time}, remaining: {remaining}",
+        "cpu_quantum_expired": "CPU {cpu}: Process {pid} used its time quantum, remaining: {remaining}",
+        "cpu_utilization": "CPU {cpu} Utilization: {utilization:.2%} (Busy Time: {busy_time})",
+        "makespan": "Makespan: {time}",
+        "summary": "\n--- {algorithm} Summary ---\n"
+                   "Average Waiting Time: {avg_waiting_time:.2f}\n"
+                   "Average Turnaround Time: {avg_turnaround_time:.2f}",
+    }
+
+    def __init__(self, stream=None, buffer_lines=4096):
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.lines = []
+
+    def emit(self, kind, time, pid=None, **fields):
+        self.lines.append(self.format(kind, time, pid, fields))
+        if len(self.lines) >= self.buffer_lines:
+            self.flush()
+
+    # Renders a single event as text
+    def format(self, kind, time, pid, fields):
+        if "priority" in fields and kind != "transient_arrival":
+            detail = f" (Priority {fields['priority']})"
+        elif "remaining" in fields and kind not in ("slice", "cpu_start"):
+            detail = f" (Remaining: {fields['remaining']})"
+        else:
+            detail = ""
+        return self.TEMPLATES[kind].format(time=time, pid=pid, detail=detail, **fields)
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines = []
+
+
+# Sink that writes one JSON object per event, in batches
+class JsonlTraceSink(TraceSink):
+    def __init__(self, file, batch_size=4096):
+        self.owns_file = isinstance(file, str)
+        self.file = open(file, "w") if self.owns_file else file
+        self.batch_size = batch_size
+        self.events = []
+
+    def emit(self, kind, time, pid=None, **fields):
+        self.events.append(json.dumps({"kind": kind, "time": time, "pid": pid, **fields}))
+        if len(self.events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.events:
+            self.file.write("\n".join(self.events) + "\n")
+            self.events = []
+
+    def close(self):
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+
+
+# Returns the sink a scheduler should use when none was passed: today's console output
+def resolve_sink(sink):
+    return TextTraceSink() if sink is None else sink
+
+
+# Emits a single event outside a scheduler run, printing it straight away when no sink is given
+def emit_event(sink, kind, time, pid=None, **fields):
+    if sink is None:
+        sink = TextTraceSink()
+        sink.emit(kind, time, pid, **fields)
+        sink.flush()
+    elif sink.enabled:
+        sink.emit(kind, time, pid, **fields)
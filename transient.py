@@ -0,0 +1,104 @@
+# transient.py
+from process import Process, create_transient_event
+from tracing import emit_event
+
+
+# Transient-event models.
+# A model is configuration only; each scheduler run calls start(rng) to get a cursor over
+# that run's events. A cursor exposes next_time (float('inf') once there are no more),
+# preemptive (whether an event interrupts the running process or waits for the next
+# dispatch point), idle_wakeup (whether an idle CPU wakes up for it) and pop(current_time,
+# sink), which returns the next event as a Process. Every event costs O(1).
+
+
+# The original model: a single event at a random time between 5 and 15 that runs to
+# completion at the first dispatch point at or after that time
+class OneShotTransientEvent:
+    def __repr__(self):
+        return "OneShotTransientEvent()"
+
+    def start(self, rng):
+        return OneShotTransientCursor(rng)
+
+
+class OneShotTransientCursor:
+    preemptive = False
+    idle_wakeup = False  # Only checked at dispatch points, as the schedulers always did
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.next_time = rng.randint(5, 15)  # Set a single event time for this run
+
+    def pop(self, current_time, sink):
+        transient_process = create_transient_event(current_time, sink, self.rng)
+
+        # Set the arrival time to the current time
+        transient_process.arrival_time = current_time
+        self.next_time = float('inf')
+        return transient_process
+
+
+ONE_SHOT = OneShotTransientEvent()
+
+
+# Draws a value from a distribution given as an inclusive (low, high) integer range or as a
+# function of the random source
+def draw(distribution, rng):
+    if callable(distribution):
+        return distribution(rng)
+    return rng.randint(*distribution)
+
+
+# Transient events arriving as a Poisson process with `rate` events per time unit.
+# Interarrival times are exponential, truncated to the integer clock (so bursts of
+# simultaneous events are possible). duration and priority are (low, high) ranges or
+# functions of the random source; use module-level functions to keep the model picklable
+# for the process-pool runners. Events get PIDs first_pid, first_pid + 1, ... and stop
+# after max_events if given. Preemptive events interrupt the running process, which
+# resumes after them; otherwise they go ahead of the ready queue at the next dispatch point.
+class PoissonTransientEvents:
+    def __init__(self, rate, duration=(1, 10), priority=(1, 5), preemptive=False, max_events=None, first_pid=999):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.duration = duration
+        self.priority = priority
+        self.preemptive = preemptive
+        self.max_events = max_events
+        self.first_pid = first_pid
+
+    def __repr__(self):
+        return (f"PoissonTransientEvents(rate={self.rate!r}, duration={self.duration!r}, "
+                f"priority={self.priority!r}, preemptive={self.preemptive!r}, "
+                f"max_events={self.max_events!r}, first_pid={self.first_pid!r})")
+
+    def start(self, rng):
+        return PoissonTransientCursor(self, rng)
+
+
+class PoissonTransientCursor:
+    idle_wakeup = True
+
+    def __init__(self, model, rng):
+        self.model = model
+        self.rng = rng
+        self.preemptive = model.preemptive
+        self.count = 0
+        self.next_time = 0
+        self.schedule_next()
+
+    def schedule_next(self):
+        if self.model.max_events is not None and self.count >= self.model.max_events:
+            self.next_time = float('inf')
+        else:
+            self.next_time += int(self.rng.expovariate(self.model.rate))
+
+    def pop(self, current_time, sink):
+        pid = self.model.first_pid + self.count
+        duration = draw(self.model.duration, self.rng)
+        priority = draw(self.model.priority, self.rng)
+        transient_process = Process(pid, self.next_time, duration, priority)
+        emit_event(sink, "transient_arrival", self.next_time, pid, duration=duration, priority=priority)
+        self.count += 1
+        self.schedule_next()
+        return transient_process